@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact store of the acestream ids already seen, and new-stream detector
+
+channel_mapping.json keys its names by 40-hex-char ids. acestream_ids.bin
+keeps the same ids as a sorted array of 20-byte binary ids, behind the
+SHA-256 of the mapping it was last synced with:
+
+    b"ACEIDS1\\n" + sha256(channel_mapping.json) + id1 + id2 + ...
+
+Lookups are binary searches over the array, so flagging the unseen ids of
+a playlist is one pass that never parses the mapping. The mapping is only
+loaded again when its hash shows it was edited by hand. --remember records
+the new ids in acestream_ids.bin only: playlists carry no channel names,
+and event ids rotate, so the curated mappings are left alone (unmapped
+streams show as default_name()). Once a stream's real name is known, --add
+appends it in place to the end of channel_mapping.json and of its
+byte-identical copy channel_mapping_dl.json, in the same layout:
+
+  python scripts/ace_ids.py eventos.m3u              # list the new streams
+  python scripts/ace_ids.py eventos.m3u --remember   # and don't list them again
+  python scripts/ace_ids.py --add 897e73c9d578848f596585314ecb9ae067c0e229 "DAZN 1"
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+ID_BYTES = 20
+MAGIC = b"ACEIDS1\n"
+DIGEST_BYTES = 32
+ID_PATTERN = re.compile(r'[0-9a-f]{40}')
+SEEN_FILE = "acestream_ids.bin"
+MAPPING_FILES = ("channel_mapping.json", "channel_mapping_dl.json")
+# Escapes used by the PowerShell ConvertTo-Json that wrote the mapping
+_PS_ESCAPES = {"<": "\\u003c", ">": "\\u003e", "&": "\\u0026", "'": "\\u0027"}
+
+
+def default_name(ace_id):
+    """Channel name shown for an id missing from the mapping"""
+    return f"Stream {ace_id[:8]}"
+
+
+def pack(ace_id):
+    return bytes.fromhex(ace_id)
+
+
+class IdSet:
+    """Sorted array of unique 20-byte ids"""
+
+    def __init__(self, data=b""):
+        self.data = bytes(data)
+
+    def __len__(self):
+        return len(self.data) // ID_BYTES
+
+    def _at(self, i):
+        return self.data[i * ID_BYTES:(i + 1) * ID_BYTES]
+
+    def __contains__(self, raw):
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._at(mid) < raw:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < len(self) and self._at(lo) == raw
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._at(i).hex()
+
+    def union(self, ace_ids):
+        """New IdSet with ace_ids added"""
+        return IdSet(b"".join(sorted({self._at(i) for i in range(len(self))} | {pack(i) for i in ace_ids})))
+
+
+def file_digest(path):
+    if not os.path.exists(path):
+        return b"\0" * DIGEST_BYTES
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def load_mapping(path=MAPPING_FILES[0]):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return json.load(f)
+    return {}
+
+
+def load_seen(path=SEEN_FILE, mapping_path=MAPPING_FILES[0]):
+    """Seen ids, merged with the mapping's keys if it changed since the last sync"""
+    seen, digest = IdSet(), None
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data.startswith(MAGIC):
+            digest = data[len(MAGIC):len(MAGIC) + DIGEST_BYTES]
+            seen = IdSet(data[len(MAGIC) + DIGEST_BYTES:])
+        else:
+            print(f"WARNING: {path}: unknown format, rebuilding")
+    if digest != file_digest(mapping_path):
+        seen = seen.union(load_mapping(mapping_path))
+    return seen
+
+
+def save_seen(seen, path=SEEN_FILE, mapping_path=MAPPING_FILES[0]):
+    with open(path + ".tmp", 'wb') as f:
+        f.write(MAGIC + file_digest(mapping_path) + seen.data)
+    os.replace(path + ".tmp", path)
+
+
+def new_ids(ace_ids, seen):
+    """ace_ids missing from seen, once each, in playlist order (malformed ids are skipped)"""
+    flagged = {}
+    for ace_id in ace_ids:
+        if ace_id in flagged or not ID_PATTERN.fullmatch(ace_id):
+            continue
+        if pack(ace_id) not in seen:
+            flagged[ace_id] = True
+    return list(flagged)
+
+
+def _ps_string(value):
+    text = json.dumps(value, ensure_ascii=False)
+    return "".join(_PS_ESCAPES.get(c, c) for c in text)
+
+
+def _ps_lines(entries):
+    return ",\n".join(f'    {_ps_string(key)}:  {_ps_string(value)}' for key, value in entries)
+
+
+def write_mapping(mapping, path):
+    """Write a {key: value} mapping in the layout of the curated files (BOM, ConvertTo-Json spacing)"""
+    with open(path + ".tmp", 'wb') as f:
+        f.write(("\ufeff{\n" + _ps_lines(mapping.items()) + "\n}\n").encode("utf-8"))
+    os.replace(path + ".tmp", path)
+
+
+def append_mapping(entries, path):
+    """Append (id, name) pairs to the JSON object at path without rewriting it"""
+    lines = _ps_lines(entries)
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(("\ufeff{\n" + lines + "\n}\n").encode("utf-8"))
+        return
+    with open(path, 'r+b') as f:
+        # Only the closing brace and the whitespace around it are read
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - 64))
+        tail = f.read()
+        start = size - len(tail)
+        close = tail.rindex(b"}")
+        end = len(tail[:close].rstrip())
+        empty = tail[:end].endswith(b"{")
+        f.seek(start + end)
+        f.write((("\n" if empty else ",\n") + lines + "\n}\n").encode("utf-8"))
+        f.truncate()
+
+
+def extend_mapping(entries, paths=MAPPING_FILES):
+    """Add (id, real channel name) pairs to every mapping file"""
+    if entries:
+        for path in paths:
+            append_mapping(entries, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the acestream ids of playlists that were never seen before")
+    parser.add_argument("playlists", nargs="*", default=["eventos.m3u"])
+    parser.add_argument("--remember", action="store_true",
+                        help=f"record the new ids in {SEEN_FILE} so they are not listed again")
+    parser.add_argument("--add", nargs=2, action="append", metavar=("ID", "NAME"), default=[],
+                        help=f"add a stream's channel name to {' and '.join(MAPPING_FILES)}")
+    parser.add_argument("--seen", default=SEEN_FILE)
+    args = parser.parse_args()
+
+    seen = load_seen(args.seen)
+    if args.add:
+        for ace_id, _ in args.add:
+            if not ID_PATTERN.fullmatch(ace_id):
+                parser.error(f"not an acestream id: {ace_id}")
+        known = load_mapping(MAPPING_FILES[0])
+        entries = [(ace_id, name) for ace_id, name in args.add if ace_id not in known]
+        for ace_id, _ in args.add:
+            if ace_id in known:
+                print(f"{ace_id} already mapped to {known[ace_id]!r}, left as is")
+        extend_mapping(entries)
+        save_seen(seen.union(ace_id for ace_id, _ in entries), args.seen)
+        print(f"{len(entries)} channel names added")
+        return 0
+
+    from generate_matches import load_events
+    titles = {}
+    for source, events in load_events(args.playlists):
+        for time_str, competition, home_team, away_team, _, ace_id in events:
+            titles.setdefault(ace_id, f"{time_str} {competition} - {home_team} - {away_team}".rstrip(" -"))
+    fresh = new_ids(titles, seen)
+
+    print(f"{len(titles)} streams, {len(fresh)} new ({len(seen)} already seen)")
+    for ace_id in fresh:
+        print(f"  {ace_id}  {titles[ace_id]}")
+    if args.remember:
+        save_seen(seen.union(fresh), args.seen)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Time-partitioned archive of the published matches
+
+canonical.write() appends every snapshot it is given to one SQLite file
+per month of match date, in $TVSPORT_ARCHIVE_DIR (default
+.cache/archive/):
+
+    snapshots    one row per write: time, feed (matches, matches_other...), hash
+    matches      one row per match, with first_seen/last_seen
+    streams      acestream ids (20-byte blobs) and channel names of a match
+    terms        word-boundary suffixes of the team and competition names
+    appearances  which snapshot listed which match
+
+terms makes name lookups an index range scan: "FC Barcelona" is stored as
+"fcbarcelona" and "barcelona", so `--team barcelona` and `--team "fc
+barcelona"` are both prefix searches. Partitions whose month ended more
+than COMPACT_AFTER_DAYS ago are compacted on the next write: the
+per-snapshot appearances (the bulk of the rows) are dropped, first/last
+seen are kept, and the file is vacuumed. A late snapshot of a compacted
+month still updates its matches and streams but adds no appearances.
+
+  python scripts/archive.py streams --team barcelona --since 2026-09-01
+  python scripts/archive.py streams --competition "la liga"
+  python scripts/archive.py streams --id 897e73c9d578848f596585314ecb9ae067c0e229
+  python scripts/archive.py stats
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+from ace_ids import ID_PATTERN, pack
+from models import normalize
+
+ARCHIVE_DIR = os.environ.get("TVSPORT_ARCHIVE_DIR") or os.path.join(
+    os.environ.get("TVSPORT_CACHE_DIR") or ".cache", "archive")
+COMPACT_AFTER_DAYS = 7
+SCHEMA_VERSION = 1
+COMPACTED = 2  # user_version of a compacted partition
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY, taken_at INTEGER NOT NULL, feed TEXT NOT NULL, sha256 TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY, date TEXT NOT NULL, time TEXT NOT NULL, kickoff INTEGER,
+    competition TEXT NOT NULL, home_team TEXT NOT NULL, away_team TEXT NOT NULL,
+    first_seen INTEGER NOT NULL, last_seen INTEGER NOT NULL,
+    UNIQUE (date, time, competition, home_team, away_team));
+CREATE TABLE IF NOT EXISTS streams (
+    match_id INTEGER NOT NULL, acestream_id BLOB NOT NULL, channel_name TEXT NOT NULL,
+    first_seen INTEGER NOT NULL, last_seen INTEGER NOT NULL,
+    PRIMARY KEY (match_id, acestream_id)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    field TEXT NOT NULL, term TEXT NOT NULL, match_id INTEGER NOT NULL,
+    PRIMARY KEY (field, term, match_id)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS appearances (
+    snapshot_id INTEGER NOT NULL, match_id INTEGER NOT NULL,
+    PRIMARY KEY (snapshot_id, match_id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS matches_date ON matches (date);
+CREATE INDEX IF NOT EXISTS matches_competition ON matches (competition);
+CREATE INDEX IF NOT EXISTS streams_acestream_id ON streams (acestream_id);
+"""
+
+
+def search_key(text):
+    return re.sub(r'[^a-z0-9]+', '', normalize(text or ""))
+
+
+def terms(text):
+    """Word-boundary suffixes of a name, squashed: "FC Barcelona" -> fcbarcelona, barcelona"""
+    words = [w for w in re.split(r'[^a-z0-9]+', normalize(text or "")) if w]
+    return {"".join(words[i:]) for i in range(len(words))}
+
+
+def partition_path(month, root=ARCHIVE_DIR):
+    return os.path.join(root, f"{month}.sqlite")
+
+
+def partitions(root=ARCHIVE_DIR, since=None, until=None):
+    """(month, path) of the partitions overlapping [since, until] (YYYY-MM-DD strings)"""
+    if not os.path.isdir(root):
+        return []
+    found = []
+    for name in sorted(os.listdir(root)):
+        month, ext = os.path.splitext(name)
+        if ext != ".sqlite" or (since and month < since[:7]) or (until and month > until[:7]):
+            continue
+        found.append((month, os.path.join(root, name)))
+    return found
+
+
+def connect(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SCHEMA)
+    if db.execute("PRAGMA user_version").fetchone()[0] == 0:
+        db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return db
+
+
+def _insert(db, feed, sha256, matches, now, appearances=True):
+    snapshot = db.execute("INSERT INTO snapshots (taken_at, feed, sha256) VALUES (?, ?, ?)",
+                          (now, feed, sha256)).lastrowid
+    for m in matches:
+        row = (m.date, m.time, m.competition or "", m.home_team or "", m.away_team or "")
+        found = db.execute("SELECT id FROM matches WHERE date=? AND time=? AND competition=? "
+                           "AND home_team=? AND away_team=?", row).fetchone()
+        if found:
+            match_id = found[0]
+            db.execute("UPDATE matches SET last_seen=?, kickoff=? WHERE id=?",
+                       (now, m.get("kickoff_epoch"), match_id))
+        else:
+            match_id = db.execute("INSERT INTO matches (date, time, competition, home_team, away_team, "
+                                  "kickoff, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                  row + (m.get("kickoff_epoch"), now, now)).lastrowid
+            db.executemany("INSERT OR IGNORE INTO terms VALUES (?, ?, ?)",
+                           [("team", t, match_id) for t in terms(m.home_team) | terms(m.away_team)]
+                           + [("competition", t, match_id) for t in terms(m.competition)])
+        db.executemany("INSERT INTO streams VALUES (?, ?, ?, ?, ?) ON CONFLICT (match_id, acestream_id) "
+                       "DO UPDATE SET last_seen=excluded.last_seen, channel_name=excluded.channel_name",
+                       [(match_id, pack(link.acestream_id), link.channel_name, now, now)
+                        for link in m.links if ID_PATTERN.fullmatch(link.acestream_id)])
+        if appearances:
+            db.execute("INSERT OR IGNORE INTO appearances VALUES (?, ?)", (snapshot, match_id))
+
+
+def record(matches, feed, sha256, root=ARCHIVE_DIR, now=None):
+    """Append a snapshot of a feed to the partitions of its match dates"""
+    now = int(now or time.time())
+    by_month = {}
+    for m in matches:
+        by_month.setdefault((m.date or "")[:7] or "unknown", []).append(m)
+    for month, group in by_month.items():
+        db = connect(partition_path(month, root))
+        try:
+            compacted = db.execute("PRAGMA user_version").fetchone()[0] >= COMPACTED
+            with db:
+                _insert(db, feed, sha256, group, now, appearances=not compacted)
+        finally:
+            db.close()
+    compact(root, today=date.fromtimestamp(now))
+
+
+def compact(root=ARCHIVE_DIR, today=None, after_days=COMPACT_AFTER_DAYS):
+    """Compact the partitions whose month ended more than after_days ago; returns their months"""
+    cutoff = ((today or date.today()) - timedelta(days=after_days)).strftime("%Y-%m")
+    done = []
+    for month, path in partitions(root):
+        if month >= cutoff or not re.fullmatch(r'\d{4}-\d{2}', month):
+            continue
+        db = sqlite3.connect(path, timeout=30)
+        try:
+            if db.execute("PRAGMA user_version").fetchone()[0] >= COMPACTED:
+                continue
+            with db:
+                db.execute("DELETE FROM appearances")
+                db.execute(f"PRAGMA user_version={COMPACTED}")
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            db.execute("VACUUM")
+            done.append(month)
+        finally:
+            db.close()
+    if done:
+        print(f"Archive: {', '.join(done)} compacted")
+    return done
+
+
+def query(team=None, competition=None, ace_id=None, since=None, until=None, root=ARCHIVE_DIR):
+    """Streams of the archived matches matching every given filter, oldest first.
+
+    team and competition match any word-boundary prefix of the name,
+    ignoring case, accents and spaces.
+    """
+    where, params = [], []
+    for field, text in (("team", team), ("competition", competition)):
+        if text:
+            key = search_key(text)
+            where.append("m.id IN (SELECT match_id FROM terms WHERE field=? AND term>=? AND term<?)")
+            params += [field, key, key + "\x7f"]
+    if ace_id:
+        where.append("s.acestream_id=?")
+        params.append(pack(ace_id))
+    if since:
+        where.append("m.date>=?")
+        params.append(since)
+    if until:
+        where.append("m.date<=?")
+        params.append(until)
+    sql = ("SELECT m.date, m.time, m.competition, m.home_team, m.away_team, hex(s.acestream_id), "
+           "s.channel_name, s.first_seen, s.last_seen FROM matches m JOIN streams s ON s.match_id=m.id"
+           + (" WHERE " + " AND ".join(where) if where else "")
+           + " ORDER BY m.date, m.time, m.competition, m.home_team, s.channel_name")
+    rows = []
+    for _, path in partitions(root, since, until):
+        db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows += [r[:5] + (r[5].lower(),) + r[6:] for r in db.execute(sql, params)]
+        finally:
+            db.close()
+    return rows
+
+
+def stats(root=ARCHIVE_DIR):
+    result = []
+    for month, path in partitions(root):
+        db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            counts = [db.execute(f"SELECT count(*) FROM {t}").fetchone()[0]
+                      for t in ("snapshots", "matches", "streams", "appearances")]
+            compacted = db.execute("PRAGMA user_version").fetchone()[0] >= COMPACTED
+        finally:
+            db.close()
+        result.append((month, compacted, os.path.getsize(path), *counts))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", default=ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    streams = sub.add_parser("streams", help="archived streams matching the filters")
+    streams.add_argument("--team")
+    streams.add_argument("--competition")
+    streams.add_argument("--id", dest="ace_id", help="acestream id")
+    streams.add_argument("--since", help="first match date (YYYY-MM-DD)")
+    streams.add_argument("--until", help="last match date (YYYY-MM-DD)")
+    streams.add_argument("--ids", action="store_true", help="only list the distinct acestream ids")
+    sub.add_parser("stats", help="rows and size of every partition")
+    sub.add_parser("compact", help="compact the old partitions now")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        compact(args.dir)
+        return 0
+    if args.command == "stats":
+        for month, compacted, size, *counts in stats(args.dir):
+            print(f"{month}  {size / 1024:8.0f} KiB  snapshots {counts[0]:6}  matches {counts[1]:6}  "
+                  f"streams {counts[2]:7}  appearances {counts[3]:8}{'  (compacted)' if compacted else ''}")
+        return 0
+
+    start = time.perf_counter()
+    rows = query(args.team, args.competition, args.ace_id, args.since, args.until, args.dir)
+    elapsed = (time.perf_counter() - start) * 1000
+    if args.ids:
+        ids = {}
+        for row in rows:
+            ids.setdefault(row[5], row[6])
+        for ace_id, channel in ids.items():
+            print(f"{ace_id}  {channel}")
+    else:
+        for d, t, competition, home, away, ace_id, channel, _, _ in rows:
+            title = f"{home} - {away}" if away else home
+            print(f"{d} {t}  {competition}: {title}  {ace_id}  {channel}")
+    print(f"{len(rows)} streams in {elapsed:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark hedged requests of the fetch scheduler on a synthetic host
+
+  python scripts/bench_hedging.py --requests 300 --tail 0.03 --errors 0.05
+
+Every request sleeps about --latency seconds; a --tail share of them
+takes --tail-latency instead, and an --errors share answers 503 right
+away. The same workload runs through a FetchScheduler with hedging
+disabled, then enabled, and the total time, the latency percentiles and
+the 503s handed back to the caller are compared. No network is used.
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fetch_scheduler
+
+HOST = "bench.invalid"
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+
+
+class SyntheticHost:
+    def __init__(self, latency, tail, tail_latency, errors, seed):
+        self.latency, self.tail, self.tail_latency, self.errors = latency, tail, tail_latency, errors
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def request(self):
+        with self.lock:
+            draw = self.random.random()
+            jitter = self.random.uniform(0.8, 1.2)
+        if draw < self.errors:
+            time.sleep(0.005)
+            return FakeResponse(503)
+        time.sleep((self.tail_latency if draw < self.errors + self.tail else self.latency) * jitter)
+        return FakeResponse(200)
+
+
+def run(args, hedge):
+    saved = fetch_scheduler.HEDGE_MIN_SAMPLES
+    fetch_scheduler.HEDGE_MIN_SAMPLES = saved if hedge else 10 ** 9
+    try:
+        scheduler = fetch_scheduler.FetchScheduler(max_connections=args.connections,
+                                                   host_rates={HOST: (10 ** 6, 10 ** 6)})
+        host = SyntheticHost(args.latency, args.tail, args.tail_latency, args.errors, args.seed)
+
+        def timed(_):
+            start = time.perf_counter()
+            response = scheduler.call(f"https://{HOST}/", host.request)
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(timed, range(args.requests)))
+        total = time.perf_counter() - start
+    finally:
+        fetch_scheduler.HEDGE_MIN_SAMPLES = saved
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        "total": total,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(0.99 * (len(latencies) - 1))],
+        "errors": sum(1 for _, status in results if status >= 500),
+        "hedged": scheduler.metrics()[HOST].get("hedged", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4, help="concurrent callers")
+    parser.add_argument("--connections", type=int, default=fetch_scheduler.MAX_CONNECTIONS)
+    parser.add_argument("--latency", type=float, default=0.05, help="usual latency (s)")
+    parser.add_argument("--tail", type=float, default=0.03, help="share of slow requests")
+    parser.add_argument("--tail-latency", type=float, default=2.0, help="latency of the slow ones (s)")
+    parser.add_argument("--errors", type=float, default=0.0, help="share of immediate 503s")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, {args.workers} callers, {args.tail:.0%} at {args.tail_latency}s, "
+          f"{args.errors:.0%} fast 503s")
+    for name, hedge in (("no hedging", False), ("hedging", True)):
+        r = run(args, hedge)
+        print(f"  {name:<11} total {r['total']:6.2f} s   p50 {r['p50'] * 1000:6.0f} ms   "
+              f"p99 {r['p99'] * 1000:6.0f} ms   503s returned {r['errors']:3}   hedged {r['hedged']}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark full-page vs targeted (SoupStrainer) parsing of match listings
+
+  python scripts/bench_html_parsing.py page1.html page2.html
+  python scripts/bench_html_parsing.py --synthetic 300
+
+Without pages, a synthetic footmercato-like listing is generated: the match
+rows are wrapped in the usual header/nav/article/footer boilerplate.
+"""
+import argparse
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import html_parsing
+
+MATCH_ROW = """
+<div class="matchList__item match">
+  <a class="match__link" href="/live/{i}-home-away/">
+    <span class="match__time">{hh:02d}:{mm:02d}</span>
+    <div class="match__team match__team--home">
+      <span class="team__logo"><img data-src="//img.example/{i}h.png" alt=""></span>
+      <span class="team__name">Home Team {i}</span>
+    </div>
+    <div class="match__team match__team--away">
+      <span class="team__logo"><img data-src="//img.example/{i}a.png" alt=""></span>
+      <span class="team__name">Away Team {i}</span>
+    </div>
+    <img class="broadcaster__logo" alt="beIN Sports 1" src="/b/{i}.png">
+  </a>
+</div>"""
+
+BOILERPLATE = """
+<div class="article"><h2>Headline {i}</h2>{paragraphs}
+  <ul class="related">{items}</ul>
+  <script>window.dataLayer.push({{"slot": {i}, "ads": [1, 2, 3]}});</script>
+</div>"""
+
+
+def synthetic_page(n_matches):
+    parts = ["<html><head><title>Matchs</title>",
+             "".join(f'<link rel="stylesheet" href="/css/{i}.css">' for i in range(40)),
+             "</head><body><nav>",
+             "".join(f'<a class="nav__link" href="/c/{i}">Compétition {i}</a>' for i in range(150)),
+             "</nav><main>"]
+    for i in range(n_matches):
+        if i % 10 == 0:
+            parts.append(f'<h3 class="competition">Compétition {i // 10}</h3>')
+        parts.append(MATCH_ROW.format(i=i, hh=12 + i % 10, mm=i % 60))
+    for i in range(n_matches):
+        parts.append(BOILERPLATE.format(
+            i=i,
+            paragraphs="".join(f"<p>Lorem ipsum <b>dolor</b> sit amet {j}</p>" for j in range(6)),
+            items="".join(f'<li><a href="/news/{i}-{j}">News {j}</a></li>' for j in range(8)),
+        ))
+    parts.append("<footer>" + "<p>footer</p>" * 200 + "</footer></main></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def extract(soup):
+    """Same fields the footmercato scraper reads"""
+    rows = []
+    for el in soup.select('.match, .matchList__item'):
+        time_el = el.select_one('.match__time')
+        home = el.select_one('.match__team--home .team__name')
+        away = el.select_one('.match__team--away .team__name')
+        if time_el and home and away:
+            rows.append((time_el.get_text(strip=True), home.get_text(strip=True), away.get_text(strip=True)))
+    return rows
+
+
+def measure(label, parse, content, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = extract(parse(content))
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    extract(parse(content))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<28} {best * 1000:8.1f} ms  {peak / 1024 / 1024:7.2f} MiB peak  {len(rows)} matches")
+    return best, peak, rows
+
+
+def bench(name, content, repeat):
+    print(f"{name} ({len(content) / 1024:.0f} KiB)")
+    parsers = ["html.parser"] + (["lxml"] if html_parsing.DEFAULT_PARSER == "lxml" else [])
+    results = {}
+    for parser in parsers:
+        results[f"full/{parser}"] = measure(
+            f"full tree, {parser}", lambda c, p=parser: BeautifulSoup(c, p), content, repeat)
+        results[f"strained/{parser}"] = measure(
+            f"match nodes only, {parser}",
+            lambda c, p=parser: html_parsing.parse_nodes(c, html_parsing.MATCH_CLASSES, p), content, repeat)
+
+    base_time, base_peak, base_rows = results["full/html.parser"]
+    for key, (t, peak, rows) in results.items():
+        if rows != base_rows:
+            print(f"  WARNING: {key} extracted different matches")
+    best_key = min(results, key=lambda k: results[k][0])
+    t, peak, _ = results[best_key]
+    print(f"  -> {best_key}: {base_time / t:.1f}x faster, {base_peak / max(peak, 1):.1f}x less memory "
+          f"than full/html.parser (the previous code path)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="*", help="saved HTML pages (e.g. from the fixture recorder)")
+    parser.add_argument("--synthetic", type=int, default=300, help="matches in the generated page")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.pages:
+        for path in args.pages:
+            with open(path, "rb") as f:
+                bench(path, f.read(), args.repeat)
+    else:
+        bench(f"synthetic page, {args.synthetic} matches", synthetic_page(args.synthetic), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
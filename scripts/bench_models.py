@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark dict match records against models.Match
+
+  python scripts/bench_models.py --events 100000
+
+Builds the same synthetic M3U events (a few hundred teams, competitions and
+channels repeated across many lines, as in eventos.m3u) into the dicts
+generate_matches.py used to build and into Match records, then compares
+the memory they hold and the time to build and serialize them.
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from models import Match, to_json
+
+
+def synthetic_events(n, seed=1):
+    """Yield (time, competition, home, away, logo, channel, acestream_id).
+
+    Every string is built fresh, like the ones split out of M3U lines.
+    """
+    rnd = random.Random(seed)
+    for i in range(n):
+        match = i // 3  # about three links per match
+        yield (
+            f"{12 + match % 10:02d}:{match % 4 * 15:02d}",
+            "Competición %d" % (match * 7 % 40),
+            "Equipo Local %d" % (match * 13 % 400),
+            "Equipo Visitante %d" % (match * 17 % 401),
+            "https://raw.githubusercontent.com/amouradore/tvsport/main/logos/Liga/%d.png" % (match * 13 % 400),
+            "M. LaLiga %d" % rnd.randrange(150),
+            "%040x" % rnd.randrange(2000),
+        )
+
+
+def build_dicts(events, date):
+    matches = {}
+    for time_str, competition, home, away, logo, channel, ace in events:
+        key = f"{time_str}|{home}|{away}"
+        if key not in matches:
+            matches[key] = {
+                'time': time_str, 'date': date, 'home_team': home, 'away_team': away,
+                'home_logo': logo, 'away_logo': logo, 'competition': competition,
+                'link': f"acestream://{ace}", 'channels': [channel],
+                'links': [{'channel_name': channel, 'acestream_id': ace}],
+            }
+        else:
+            matches[key]['channels'].append(channel)
+            matches[key]['links'].append({'channel_name': channel, 'acestream_id': ace})
+    return list(matches.values())
+
+
+def build_records(events, date):
+    matches = {}
+    for time_str, competition, home, away, logo, channel, ace in events:
+        key = f"{time_str}|{home}|{away}"
+        if key not in matches:
+            matches[key] = Match(time_str, date, home, away, logo, logo, competition, f"acestream://{ace}")
+        matches[key].add_link(channel, ace)
+    return list(matches.values())
+
+
+def measure(label, build, n, date):
+    start = time.perf_counter()
+    matches = build(synthetic_events(n), date)
+    built = time.perf_counter() - start
+    del matches
+    tracemalloc.start()
+    matches = build(synthetic_events(n), date)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    out = json.dumps(matches, ensure_ascii=False, default=to_json)
+    dumped = time.perf_counter() - start
+    print(f"  {label:<14} {held / 1024 / 1024:7.2f} MiB held  {built * 1000:7.0f} ms build  "
+          f"{dumped * 1000:7.0f} ms json  {len(matches)} matches")
+    return held, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=100000, help="number of #EXTINF entries")
+    args = parser.parse_args()
+
+    date = time.strftime("%Y-%m-%d")
+    print(f"{args.events} events")
+    dict_held, dict_out = measure("dicts", build_dicts, args.events, date)
+    rec_held, rec_out = measure("Match records", build_records, args.events, date)
+    if json.loads(dict_out) != json.loads(rec_out):
+        print("  WARNING: serialized output differs")
+    print(f"  -> {dict_held / max(rec_held, 1):.1f}x less memory with Match records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark the start-up time of the tvsport CLI
+
+  python scripts/bench_startup.py --runs 20 --cold
+
+Starts fresh interpreters and times `tvsport.py generate --help` against
+a CLI that imports every command up front (requests, bs4 and the
+scrapers included), the way each script used to be started. --cold gives
+every run an empty bytecode cache, like a fresh checkout on a cron
+runner.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+TVSPORT = os.path.join(SCRIPTS_DIR, "tvsport.py")
+EAGER = ("import sys; sys.argv = ['generate_matches.py', '--help']; "
+         "import requests, bs4, scrape_multi_sources, scrape_icastresana_eventos, scrape_matches, "
+         "generator_daemon, generate_matches; generate_matches.main()")
+
+CASES = [
+    ("python -c pass", ["-c", "pass"]),
+    ("eager imports, generate --help", ["-c", EAGER]),
+    ("tvsport.py generate --help", [TVSPORT, "generate", "--help"]),
+    ("tvsport.py times --help", [TVSPORT, "times", "--help"]),
+]
+
+
+def time_run(args, cold):
+    env = dict(os.environ, PYTHONPATH=SCRIPTS_DIR)
+    with tempfile.TemporaryDirectory() as cache:
+        if cold:
+            env["PYTHONPYCACHEPREFIX"] = cache
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--cold", action="store_true", help="empty bytecode cache for every run")
+    args = parser.parse_args()
+
+    print(f"{args.runs} runs per case{' (cold bytecode cache)' if args.cold else ''}")
+    medians = {}
+    for name, cmd in CASES:
+        times = [time_run(cmd, args.cold) for _ in range(args.runs)]
+        medians[name] = statistics.median(times)
+        print(f"  {name:<34} median {medians[name]:7.1f} ms   min {min(times):7.1f} ms")
+    eager, lazy = medians[CASES[1][0]], medians[CASES[2][0]]
+    print(f"  -> generate starts {eager - lazy:.0f} ms faster ({eager / lazy:.1f}x) with lazy imports")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build small, content-addressed logo variants for the TV clients
+
+For every logos/<league>/<team>.png this writes 64 and 128 px variants as
+quantized PNG and WebP into logo_assets/, named after the hash of their
+content, plus logo_assets/manifest.json which generate_matches.py resolves
+team names against. Names only change when the image does, so clients can
+cache them forever. Unchanged sources are not re-encoded.
+
+  python scripts/build_logos.py
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+
+from PIL import Image
+
+from models import normalize
+
+LOGOS_DIR = "logos"
+ASSETS_DIR = "logo_assets"
+MANIFEST = os.path.join(ASSETS_DIR, "manifest.json")
+SIZES = (64, 128)
+FORMATS = ("png", "webp")
+# Bump when the encoding settings change so every variant gets rebuilt
+BUILD_VERSION = 1
+
+
+def encode(img, size, fmt):
+    """Fit img in a size x size box and encode it"""
+    variant = img.copy()
+    variant.thumbnail((size, size), Image.LANCZOS)
+    # 256-colour palette with alpha: badges are flat artwork, and a lossless
+    # palette image beats lossy WebP on both size and encode time here
+    variant = variant.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+    out = io.BytesIO()
+    if fmt == "png":
+        variant.save(out, "PNG", optimize=True)
+    else:
+        variant.save(out, "WEBP", lossless=True, method=4)
+    return out.getvalue()
+
+
+def write_asset(data, fmt):
+    """Store data under its content hash, return the file name"""
+    name = f"{hashlib.sha256(data).hexdigest()[:16]}.{fmt}"
+    path = os.path.join(ASSETS_DIR, name)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(data)
+    return name
+
+
+def load_manifest():
+    if os.path.exists(MANIFEST):
+        with open(MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == BUILD_VERSION:
+            return manifest
+    return {"version": BUILD_VERSION, "sizes": list(SIZES), "formats": list(FORMATS), "teams": {}}
+
+
+def build():
+    if not os.path.isdir(LOGOS_DIR):
+        print(f"ERROR: {LOGOS_DIR}/ folder not found")
+        return 1
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    previous = load_manifest()["teams"]
+    teams = {}
+    source_bytes = variant_bytes = encoded = 0
+
+    for league in sorted(os.listdir(LOGOS_DIR)):
+        league_path = os.path.join(LOGOS_DIR, league)
+        if not os.path.isdir(league_path):
+            continue
+        for fname in sorted(os.listdir(league_path)):
+            if not fname.endswith('.png'):
+                continue
+            path = os.path.join(league_path, fname)
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            key = normalize(fname[:-4])
+            source_bytes += len(data)
+
+            entry = previous.get(key)
+            if not entry or entry["sha256"] != digest or not all(
+                    os.path.exists(os.path.join(ASSETS_DIR, entry[str(size)][fmt]))
+                    for size in SIZES for fmt in FORMATS):
+                img = Image.open(io.BytesIO(data)).convert("RGBA")
+                entry = {"source": f"{league}/{fname}", "sha256": digest}
+                for size in SIZES:
+                    entry[str(size)] = {fmt: write_asset(encode(img, size, fmt), fmt) for fmt in FORMATS}
+                encoded += 1
+            entry["source"] = f"{league}/{fname}"
+            teams[key] = entry
+            variant_bytes += os.path.getsize(os.path.join(ASSETS_DIR, entry["128"]["webp"]))
+
+    # Drop variants no team points to any more
+    referenced = {entry[str(size)][fmt] for entry in teams.values() for size in SIZES for fmt in FORMATS}
+    removed = 0
+    for name in os.listdir(ASSETS_DIR):
+        if name != os.path.basename(MANIFEST) and name not in referenced:
+            os.remove(os.path.join(ASSETS_DIR, name))
+            removed += 1
+
+    manifest = {"version": BUILD_VERSION, "sizes": list(SIZES), "formats": list(FORMATS),
+                "teams": dict(sorted(teams.items()))}
+    with open(MANIFEST + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(MANIFEST + ".tmp", MANIFEST)
+
+    print(f"{len(teams)} logos, {encoded} re-encoded, {removed} stale variants removed")
+    if teams:
+        print(f"Source PNGs: {source_bytes / 1024:.0f} KiB, 128px WebP: {variant_bytes / 1024:.0f} KiB "
+              f"({source_bytes / max(variant_bytes, 1):.1f}x smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(build())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Build responsive, content-addressed images for the siteweb landing page
+
+Every local <img> of siteweb/index.html is replaced by a <picture> with
+WebP and JPEG (PNG for transparent sources) variants in siteweb/img/,
+named after the hash of their content, plus siteweb/img/manifest.json.
+The variant widths come from the sizes attribute of the tag (each px
+value at 1x and 2x, capped at the source width); the <img> gets
+width/height, decoding="async", loading="lazy" unless the markup says
+loading="eager", and a blurred 16 px placeholder as inline background.
+The icon <link> points to a FAVICON_SIZE PNG instead of the full logo.
+
+The original file name stays in data-src, so running the build again
+after changing an image, a sizes attribute or the encoding settings
+rewrites the markup from the source images. Unchanged variants are not
+re-encoded and variants nothing points to any more are removed.
+
+  python scripts/build_site_images.py
+"""
+import base64
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import sys
+
+from PIL import Image, ImageFilter
+
+SITE_DIR = "siteweb"
+PAGE = os.path.join(SITE_DIR, "index.html")
+ASSETS_DIR = os.path.join(SITE_DIR, "img")
+MANIFEST = os.path.join(ASSETS_DIR, "manifest.json")
+DENSITIES = (1, 2)
+DEFAULT_WIDTHS = (480, 960, 1440)  # sizes without a px value (100vw...)
+FAVICON_SIZE = 64
+PLACEHOLDER_WIDTH = 16
+WEBP_QUALITY = 75
+JPEG_QUALITY = 80
+# Bump when the encoding settings change so every variant gets rebuilt
+BUILD_VERSION = 1
+
+# A <picture> written by a previous build, or a plain <img>
+IMG_RE = re.compile(r'<picture>\s*<source[^>]*>\s*(<img\b[^>]*>)\s*</picture>|<img\b[^>]*>')
+ICON_RE = re.compile(r'<link\b[^>]*\brel="icon"[^>]*>')
+ATTR_RE = re.compile(r'([\w:-]+)(?:="([^"]*)")?')
+# Attributes the build writes itself
+GENERATED = {"src", "srcset", "sizes", "width", "height", "loading", "decoding", "style", "data-src"}
+
+
+def parse_attrs(tag):
+    body = re.sub(r'^<\w+|/?>$', '', tag)
+    return {name: html.unescape(value) if value else value for name, value in
+            ((m.group(1), m.group(2)) for m in ATTR_RE.finditer(body))}
+
+
+def render(name, attrs):
+    parts = [name] + [key if value is None else f'{key}="{html.escape(value)}"'
+                      for key, value in attrs.items()]
+    return f"<{' '.join(parts)}>"
+
+
+def is_local(src):
+    return bool(src) and not re.match(r'^(?:[a-z]+:|//|img/)', src)
+
+
+def widths_for(sizes, source_width):
+    """srcset widths for a sizes attribute: each px value at every density"""
+    values = [part.split()[-1] for part in (sizes or "").split(",") if part.strip()]
+    px = [float(v[:-2]) for v in values if v.endswith("px")]
+    wanted = [round(p * d) for p in px for d in DENSITIES] if px else DEFAULT_WIDTHS
+    return sorted({min(w, source_width) for w in wanted})
+
+
+def encode(img, width, fmt):
+    variant = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS) \
+        if width < img.width else img
+    out = io.BytesIO()
+    if fmt == "webp":
+        variant.save(out, "WEBP", quality=WEBP_QUALITY, method=6)
+    elif fmt == "jpeg":
+        variant.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        variant.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def placeholder(img):
+    """Tiny blurred JPEG of img as a data: URI"""
+    small = img.convert("RGB")
+    small.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH * 4), Image.LANCZOS)
+    small = small.filter(ImageFilter.GaussianBlur(1))
+    out = io.BytesIO()
+    small.save(out, "JPEG", quality=40, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(out.getvalue()).decode("ascii")
+
+
+def write_asset(data, fmt):
+    """Store data under its content hash, return the file name"""
+    ext = "jpg" if fmt == "jpeg" else fmt
+    name = f"{hashlib.sha256(data).hexdigest()[:16]}.{ext}"
+    path = os.path.join(ASSETS_DIR, name)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(data)
+    return name
+
+
+def load_manifest():
+    if os.path.exists(MANIFEST):
+        with open(MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == BUILD_VERSION:
+            return manifest
+    return {"version": BUILD_VERSION, "images": {}}
+
+
+class Builder:
+    def __init__(self, previous):
+        self.previous = previous
+        self.images = {}
+        self.encoded = 0
+        # What a 2x screen fetches: largest WebP of every <picture> and the icon,
+        # {(source, variant key): fetched before the first paint}
+        self.downloads = {}
+
+    def entry(self, src):
+        """Manifest entry of a source image; None if it does not exist"""
+        if src in self.images:
+            return self.images[src]
+        path = os.path.join(SITE_DIR, src)
+        if not os.path.isfile(path):
+            print(f"WARNING: {path} not found, tag left as is")
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        entry = self.previous.get(src)
+        if not entry or entry["sha256"] != digest:
+            img = Image.open(io.BytesIO(data))
+            img.load()
+            entry = {"sha256": digest, "bytes": len(data), "width": img.width, "height": img.height,
+                     "fallback": "png" if img.mode in ("RGBA", "LA", "P") else "jpeg",
+                     "placeholder": placeholder(img), "variants": {}}
+        entry["_data"] = data
+        self.images[src] = entry
+        return entry
+
+    def variant(self, src, width, fmt):
+        """File name of the width px fmt variant of src, encoded if missing"""
+        entry = self.images[src]
+        key = f"{width}.{fmt}"
+        name = entry["variants"].get(key)
+        if name and os.path.exists(os.path.join(ASSETS_DIR, name)):
+            return name
+        img = Image.open(io.BytesIO(entry["_data"]))
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if entry["fallback"] == "png" else "RGB")
+        name = entry["variants"][key] = write_asset(encode(img, width, fmt), fmt)
+        self.encoded += 1
+        return name
+
+    def picture(self, tag):
+        """<picture> markup of an <img> tag (original or previously built)"""
+        attrs = parse_attrs(tag)
+        src = attrs.get("data-src") or attrs.get("src")
+        entry = self.entry(src) if is_local(src) else None
+        if entry is None:
+            return tag
+        sizes = attrs.get("sizes") or "100vw"
+        widths = widths_for(sizes, entry["width"])
+        fallback = entry["fallback"]
+
+        def srcset(fmt):
+            return ", ".join(f"img/{self.variant(src, w, fmt)} {w}w" for w in widths)
+
+        img = {key: value for key, value in attrs.items() if key not in GENERATED}
+        img.update({
+            "src": f"img/{self.variant(src, widths[0], fallback)}",
+            "srcset": srcset(fallback),
+            "sizes": sizes,
+            "width": str(widths[0]),
+            "height": str(round(entry["height"] * widths[0] / entry["width"])),
+            "loading": "eager" if attrs.get("loading") == "eager" else "lazy",
+            "decoding": "async",
+            "style": f"background:url({entry['placeholder']}) center/cover no-repeat",
+            "data-src": src,
+        })
+        key = (src, f"{widths[-1]}.webp")
+        self.downloads[key] = self.downloads.get(key) or img["loading"] == "eager"
+        source = render("source", {"type": "image/webp", "srcset": srcset("webp"), "sizes": sizes})
+        return f"<picture>{source}{render('img', img)}</picture>"
+
+    def transfer(self, eager_only=False):
+        """(bytes of the source images, bytes of their variants) fetched by a 2x screen"""
+        sources, variants = set(), set()
+        for (src, key), eager in self.downloads.items():
+            if eager or not eager_only:
+                sources.add(src)
+                variants.add(self.images[src]["variants"][key])
+        return (sum(self.images[src]["bytes"] for src in sources),
+                sum(os.path.getsize(os.path.join(ASSETS_DIR, name)) for name in variants))
+
+    def icon(self, tag):
+        attrs = parse_attrs(tag)
+        src = attrs.get("data-src") or attrs.get("href")
+        entry = self.entry(src) if is_local(src) else None
+        if entry is None:
+            return tag
+        self.downloads[(src, f"{FAVICON_SIZE}.png")] = True
+        # Square icons only: a FAVICON_SIZE box is enough for every browser tab
+        attrs.update({"type": "image/png", "href": f"img/{self.variant(src, FAVICON_SIZE, 'png')}",
+                      "sizes": f"{FAVICON_SIZE}x{FAVICON_SIZE}", "data-src": src})
+        return render("link", attrs)
+
+
+def build():
+    if not os.path.isfile(PAGE):
+        print(f"ERROR: {PAGE} not found")
+        return 1
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    with open(PAGE, "r", encoding="utf-8") as f:
+        markup = f.read()
+    builder = Builder(load_manifest()["images"])
+    markup = IMG_RE.sub(lambda m: builder.picture(m.group(1) or m.group(0)), markup)
+    markup = ICON_RE.sub(lambda m: builder.icon(m.group(0)), markup)
+
+    totals = [builder.transfer(), builder.transfer(eager_only=True)]
+
+    # Drop variants nothing points to any more
+    for entry in builder.images.values():
+        entry.pop("_data")
+        entry["variants"] = {key: name for key, name in entry["variants"].items()
+                             if f"img/{name}" in markup}
+    referenced = {name for entry in builder.images.values() for name in entry["variants"].values()}
+    removed = 0
+    for name in os.listdir(ASSETS_DIR):
+        if name != os.path.basename(MANIFEST) and name not in referenced:
+            os.remove(os.path.join(ASSETS_DIR, name))
+            removed += 1
+
+    manifest = {"version": BUILD_VERSION, "images": dict(sorted(builder.images.items()))}
+    with open(MANIFEST + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(MANIFEST + ".tmp", MANIFEST)
+    with open(PAGE + ".tmp", "w", encoding="utf-8") as f:
+        f.write(markup)
+    os.replace(PAGE + ".tmp", PAGE)
+
+    print(f"{len(builder.images)} images, {builder.encoded} variants encoded, {removed} stale variants removed")
+    for label, (old, new) in zip(("Page images", "Above the fold"), totals):
+        print(f"{label}: {old / 1024:.0f} KiB -> {new / 1024:.0f} KiB on a 2x screen "
+              f"({old / max(new, 1):.1f}x smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(build())
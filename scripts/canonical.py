@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Canonical match output and semantic content hash
+
+The same matches must always produce the same bytes, whatever order the
+feed listed them (or their streams) in, so that unchanged data neither
+gets committed again nor re-downloaded by the clients:
+
+- matches are sorted on (kickoff, competition, teams, link), or on a
+  caller-supplied key;
+- links are deduplicated on their acestream id; the one `link` points at
+  (the feed's primary stream, which the app plays by default) comes first
+  and the others follow sorted by channel name;
+- explicit channel lists keep their order (it is the source's own
+  priority) but lose duplicates.
+
+write() also adds kickoff_epoch/end_epoch to every match and stores the
+time_index sidecar (<name>.times.json). Next to each file, it stores a
+small <name>.hash.json sidecar holding the SHA-256 of the canonical
+content, and leaves the files untouched when that hash did not change:
+
+    {"sha256": "3f1c...", "matches": 42}
+
+Changing only the format (minify) still rewrites the file. Every new
+content (new hash) is also appended to the SQLite archive (archive.py).
+"""
+import hashlib
+import json
+import os
+
+import json_stream
+import time_index
+from feedtime import kickoff_epoch
+
+
+def match_key(m):
+    # Kickoff instant rather than the "HH:MM" strings; unparsable times last
+    start = m.get("kickoff_epoch") or kickoff_epoch(m)
+    return (start is None, start or 0, m.date, m.time, m.competition, m.home_team, m.away_team, m.link)
+
+
+def canonicalize(matches, key=match_key):
+    """Normalize every match in place, return them in canonical order
+
+    key=None keeps the given order (the caller already sorted on a
+    deterministic key).
+    """
+    matches = list(matches)
+    for m in matches:
+        if m.links:
+            unique = {}
+            for link in m.links:
+                unique.setdefault(link.acestream_id, link)
+            primary = m.link[len('acestream://'):] if m.link.startswith('acestream://') else None
+            m.links = sorted(unique.values(),
+                             key=lambda l: (l.acestream_id != primary, l.channel_name, l.acestream_id))
+        if m._channels is not None:
+            m.channels = list(dict.fromkeys(c for c in m._channels if c))
+    if key:
+        matches.sort(key=key)
+    return matches
+
+
+def content_hash(matches):
+    """SHA-256 of the matches, independent of indentation and encoder"""
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    h = hashlib.sha256()
+    for m in matches:
+        h.update(encoder.encode(m.to_dict()).encode('utf-8'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def sidecar_path(path):
+    return os.path.splitext(path)[0] + ".hash.json"
+
+
+def read_sidecar(path):
+    """Sidecar recorded for a file, or {}"""
+    try:
+        with open(sidecar_path(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _archive(matches, path, sha256):
+    """Append the snapshot to the archive (TVSPORT_ARCHIVE=0 disables it); never fails the write"""
+    if os.environ.get("TVSPORT_ARCHIVE", "1").lower() in ("0", "false", "no", "off"):
+        return
+    try:
+        import archive  # sqlite3 and the archive only load when writing
+        archive.record(matches, os.path.splitext(os.path.basename(path))[0], sha256)
+    except Exception as e:
+        print(f"WARNING: archive not updated: {e}")
+
+
+def write(matches, path, key=match_key, minify=None):
+    """Canonicalize matches and write them to path unless their hash is unchanged.
+
+    Returns True if the file was (re)written.
+    """
+    if minify is None:
+        minify = json_stream.default_minify()
+    matches = canonicalize(matches, key)
+    time_index.annotate(matches)
+    sidecar = {"sha256": content_hash(matches), "matches": len(matches)}
+    if minify:
+        sidecar["minified"] = True
+    previous = read_sidecar(path)
+    # Archive new content only: retries and unchanged runs would add identical snapshots
+    if sidecar["sha256"] != previous.get("sha256"):
+        _archive(matches, path, sidecar["sha256"])
+    if (sidecar == previous and os.path.exists(path)
+            and os.path.exists(time_index.index_path(path))):
+        print(f"{path}: inchangé ({sidecar['sha256'][:12]})")
+        return False
+    json_stream.dump(matches, path, minify=minify)
+    time_index.write(matches, path)
+    with open(sidecar_path(path) + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(sidecar, f)
+    os.replace(sidecar_path(path) + ".tmp", sidecar_path(path))
+    return True
+
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kickoff time helpers for match records
+
+Feeds publish "date" (YYYY-MM-DD) and "time" (HH:MM) in the broadcaster's
+local time; TVSPORT_FEED_TZ overrides the default Europe/Madrid.
+"""
+import os
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+DEFAULT_FEED_TZ = "Europe/Madrid"
+
+
+def feed_tz():
+    """Timezone the feed times are expressed in"""
+    return ZoneInfo(os.environ.get("TVSPORT_FEED_TZ") or DEFAULT_FEED_TZ)
+
+
+def kickoff(match, tz=None):
+    """Aware kickoff datetime of a match record, or None if date/time don't parse"""
+    try:
+        naive = datetime.strptime(f"{match.get('date', '')} {match.get('time', '')}", "%Y-%m-%d %H:%M")
+    except ValueError:
+        return None
+    return naive.replace(tzinfo=tz or feed_tz())
+
+
+def kickoff_epoch(match, tz=None):
+    """Kickoff as a UTC epoch (int), or None"""
+    dt = kickoff(match, tz)
+    return int(dt.timestamp()) if dt else None
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared fetch scheduler: per-host token buckets, global concurrency cap,
+hedged requests
+
+Every GET of httpclient.get() goes through one process-wide scheduler:
+
+- each host has a token bucket (HOST_RATES, requests per second and
+  burst), so the footmercato detail pages or the TheSportsDB logo lookups
+  fanned out by sources.map_concurrent() no longer hit a host all at once;
+  a 429 pauses the host for its Retry-After;
+- at most $TVSPORT_MAX_CONNECTIONS (default 8) requests are in flight;
+- once a host has HEDGE_MIN_SAMPLES latencies, a request still pending
+  after the host's p95 gets a duplicate, if the host's bucket and the
+  global cap allow one right away; the first good response wins (a 5xx
+  or 429 only if the other attempt fails too).
+
+sources.write_metrics() stores the per-host counters;
+scripts/bench_hedging.py measures hedging on a synthetic host.
+"""
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from urllib.parse import urlsplit
+
+# host -> (requests per second, burst); the burst covers a normal run
+HOST_RATES = {
+    "www.footmercato.net": (4, 8),
+    "www.thesportsdb.com": (0.5, 20),   # free API key: about 30 requests per minute
+    "livetv.sx": (2, 4),
+}
+DEFAULT_RATE = (5, 10)
+MAX_CONNECTIONS = int(os.environ.get("TVSPORT_MAX_CONNECTIONS") or 8)
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+HEDGE_PERCENTILE = 0.95
+MIN_HEDGE_DELAY = 0.05   # seconds; below this a duplicate costs more than it saves
+MAX_RETRY_AFTER = 60
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def try_acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self.paused_until and self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self):
+        """Take a token, sleeping until one is available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class LatencyWindow:
+    """Latest latencies of a host"""
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p=HEDGE_PERCENTILE, min_samples=None):
+        """None until min_samples (default HEDGE_MIN_SAMPLES) latencies were seen"""
+        with self.lock:
+            if len(self.samples) < (HEDGE_MIN_SAMPLES if min_samples is None else min_samples):
+                return None
+            ordered = sorted(self.samples)
+        return ordered[int(p * (len(ordered) - 1))]
+
+
+def _is_failure(response):
+    return response.status_code >= 500 or response.status_code == 429
+
+
+def _retry_after(response):
+    try:
+        return min(float(response.headers.get("Retry-After", 1)), MAX_RETRY_AFTER)
+    except ValueError:  # HTTP-date form
+        return 1.0
+
+
+class FetchScheduler:
+    def __init__(self, max_connections=MAX_CONNECTIONS, host_rates=None, default_rate=DEFAULT_RATE):
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.host_rates = HOST_RATES if host_rates is None else host_rates
+        self.default_rate = default_rate
+        self.buckets = {}
+        self.latency = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="fetch")
+
+    def _host(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(*self.host_rates.get(host, self.default_rate))
+                self.latency[host] = LatencyWindow()
+                self.counters[host] = Counter()
+            return self.buckets[host], self.latency[host], self.counters[host]
+
+    def _count(self, counters, key, n=1):
+        with self.lock:
+            counters[key] += n
+
+    def _attempt(self, host, request):
+        """Run request() on a slot already held; releases it"""
+        bucket, latency, counters = self._host(host)
+        start = time.perf_counter()
+        try:
+            response = request()
+        finally:
+            self.slots.release()
+        latency.add(time.perf_counter() - start)
+        if response.status_code == 429:
+            bucket.pause(_retry_after(response))
+            self._count(counters, "throttled_by_host")
+        return response
+
+    def call(self, url, request):
+        """Schedule request() (a GET of url) and return its response"""
+        host = urlsplit(url).hostname or url
+        bucket, latency, counters = self._host(host)
+        waited = bucket.acquire()
+        self.slots.acquire()
+        self._count(counters, "requests")
+        self._count(counters, "wait_ms", round(waited * 1000))
+
+        threshold = latency.percentile()
+        if threshold is None:
+            return self._attempt(host, request)
+
+        primary = self.pool.submit(self._attempt, host, request)
+        try:
+            return primary.result(timeout=max(threshold, MIN_HEDGE_DELAY))
+        except FutureTimeout:
+            pass
+        # Hedge only if it neither waits for a token nor exceeds the cap
+        if not self.slots.acquire(blocking=False):
+            return primary.result()
+        if not bucket.try_acquire():
+            self.slots.release()
+            return primary.result()
+        self._count(counters, "hedged")
+        hedge = self.pool.submit(self._attempt, host, request)
+
+        # A 5xx or 429 only wins once the other attempt failed too
+        pending, error, failed = {primary, hedge}, None, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                elif _is_failure(future.result()):
+                    failed = failed or future.result()
+                else:
+                    if future is hedge:
+                        self._count(counters, "hedge_wins")
+                    return future.result()
+        if failed is not None:
+            return failed
+        raise error
+
+    def metrics(self):
+        """{host: counters and p95 latency in ms}"""
+        with self.lock:
+            hosts = list(self.counters)
+        metrics = {}
+        for host in hosts:
+            p95 = self.latency[host].percentile(min_samples=1)
+            metrics[host] = dict(self.counters[host], p95_ms=round(p95 * 1000) if p95 is not None else None)
+        return metrics
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def scheduler():
+    """Process-wide scheduler, created on first use"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = FetchScheduler()
+        return _scheduler
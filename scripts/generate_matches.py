@@ -3,19 +3,45 @@
 """
 Generate matches.json and matches_other.json from eventos.m3u
 With team logos from the logos/ folder
+
+Other local or remote playlists can be merged in:
+  python scripts/generate_matches.py eventos.m3u https://example.com/list.m3u
+
+After pulling the other pipelines' partials, rebuild the published files
+and their shards, guide and playlists without parsing anything:
+  python scripts/generate_matches.py --merge-only --shards --xmltv epg.xml.gz
 """
+import argparse
 import json
 import re
 import os
-import unicodedata
 import urllib.parse
 from datetime import datetime
 
+import canonical
+import profiling
+import publish
+from ace_ids import default_name
+from models import Match, normalize
+
 EXCLUDED = ["liga fem", "1rfef", "segunda", "acb", "ehf europeo", 
             "liga nacional juvenil", "liga guerreras", "2rfef", 
             "las carreras", "open australia wta", "wta"]
 
 LOGOS_URL = "https://raw.githubusercontent.com/amouradore/tvsport/main/logos"
+# Resized, content-hashed variants written by build_logos.py
+ASSETS_URL = "https://raw.githubusercontent.com/amouradore/tvsport/main/logo_assets"
+ASSETS_MANIFEST = os.path.join("logo_assets", "manifest.json")
+LOGO_VARIANT = ("128", "webp")
+
+# Resolved logo URL -> local file, filled by load_logos()
+LOGO_FILES = {}
+
+DEFAULT_LOGO = "https://i.ibb.co/2vhFM7h/soccer-ball-variant.png"
+DEFAULT_PLAYLISTS = ("eventos.m3u",)
+SOURCE_NAME = "eventos"  # partial name in publish.py
+MAIN_FILE, OTHER_FILE = "matches.json", "matches_other.json"
+MAX_SOURCE_WORKERS = 8
 
 # Team name aliases: key = name in eventos.m3u (lowercase), value = normalized logo filename
 ALIASES = {
@@ -108,12 +134,6 @@ ALIASES = {
     "kobenhavn": "fc copenhagen", "copenhagen": "fc copenhagen",
 }
 
-def normalize(s):
-    """Remove accents and lowercase"""
-    s = unicodedata.normalize('NFD', s)
-    s = ''.join(c for c in s if unicodedata.category(c) != 'Mn')
-    return s.lower().strip()
-
 def load_logos():
     """Load all available logos from logos/ folder"""
     logos = {}
@@ -121,17 +141,33 @@ def load_logos():
         print("WARNING: logos/ folder not found")
         return logos
     
-    for league in os.listdir("logos"):
+    # Sorted: partial matches in find_logo() take the first hit
+    for league in sorted(os.listdir("logos")):
         league_path = os.path.join("logos", league)
         if not os.path.isdir(league_path):
             continue
-        for fname in os.listdir(league_path):
+        for fname in sorted(os.listdir(league_path)):
             if not fname.endswith('.png'):
                 continue
             team_name = fname[:-4]  # Remove .png
             key = normalize(team_name)
             url = f"{LOGOS_URL}/{urllib.parse.quote(league)}/{urllib.parse.quote(fname)}"
             logos[key] = url
+            LOGO_FILES[url] = os.path.join(league_path, fname)
+    
+    # Prefer the small variants for every logo the manifest knows about
+    if os.path.exists(ASSETS_MANIFEST):
+        with open(ASSETS_MANIFEST, 'r', encoding='utf-8') as f:
+            teams = json.load(f).get('teams', {})
+        size, fmt = LOGO_VARIANT
+        resized = 0
+        for key, entry in teams.items():
+            if key in logos:
+                url = f"{ASSETS_URL}/{entry[size][fmt]}"
+                LOGO_FILES[url] = LOGO_FILES[logos[key]]
+                logos[key] = url
+                resized += 1
+        print(f"Using {resized} resized logos from {ASSETS_MANIFEST}")
     
     print(f"Loaded {len(logos)} logos")
     return logos
@@ -178,26 +214,25 @@ def load_channels():
             return json.load(f)
     return {}
 
-def parse_eventos():
-    """Parse eventos.m3u and generate matches"""
-    logos = load_logos()
-    channels = load_channels()
-    
-    main_matches = {}
-    other_matches = {}
-    today = datetime.now().strftime("%Y-%m-%d")
-    default_logo = "https://i.ibb.co/2vhFM7h/soccer-ball-variant.png"
-    
+def read_playlist(source):
+    """Lines of a local or http(s) M3U playlist"""
+    if source.startswith(('http://', 'https://')):
+        import sources  # only remote playlists need the HTTP stack
+        response = sources.fetch(source, timeout=15)
+        response.raise_for_status()
+        data = response.content
+    else:
+        with open(source, 'rb') as f:
+            data = f.read()
     try:
-        with open('eventos.m3u', 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        text = data.decode('utf-8')
     except UnicodeDecodeError:
-        print("WARNING: utf-8 decode failed, trying latin-1")
-        with open('eventos.m3u', 'r', encoding='latin-1') as f:
-            lines = f.readlines()
-    
-    print(f"Processing {len(lines)} lines from eventos.m3u")
-    
+        print(f"WARNING: {source}: utf-8 decode failed, trying latin-1")
+        text = data.decode('latin-1')
+    return text.splitlines()
+
+def parse_events(lines, default_logo=DEFAULT_LOGO):
+    """Yield (time, competition, home, away, line logo, acestream id) for each entry of a playlist"""
     for i, line in enumerate(lines):
         line = line.strip()
         if not line.startswith('#EXTINF:'):
@@ -237,59 +272,177 @@ def parse_eventos():
         if not next_line.startswith('acestream://'):
             continue
         
-        acestream_id = next_line.replace('acestream://', '')
-        match_key = f"{time_str}|{home_team}|{away_team}"
-        
-        # Find logos
-        home_logo = find_logo(home_team, logos, line_default)
-        away_logo = find_logo(away_team, logos, line_default)
-        
-        # Determine target dict
-        target = other_matches if is_excluded(competition) else main_matches
-        
-        # Get channel name
-        channel_name = channels.get(acestream_id, f"Stream {acestream_id[:8]}")
-        
-        if match_key not in target:
-            target[match_key] = {
-                'time': time_str,
-                'date': today,
-                'home_team': home_team,
-                'away_team': away_team,
-                'home_logo': home_logo,
-                'away_logo': away_logo,
-                'competition': competition,
-                'link': f"acestream://{acestream_id}",
-                'channels': [channel_name],
-                'links': [{'channel_name': channel_name, 'acestream_id': acestream_id}]
-            }
-        else:
-            target[match_key]['channels'].append(channel_name)
-            target[match_key]['links'].append({
-                'channel_name': channel_name,
-                'acestream_id': acestream_id
-            })
+        yield time_str, competition, home_team, away_team, line_default, next_line.replace('acestream://', '')
+
+def load_events(playlists):
+    """[(source, events)] for every playlist, read and parsed concurrently, in the given order"""
+    def load(source):
+        try:
+            lines = read_playlist(source)
+        except Exception as e:
+            print(f"WARNING: {source} skipped: {e}")
+            return source, None
+        events = list(parse_events(lines))
+        print(f"Processing {len(lines)} lines from {source}: {len(events)} links")
+        return source, events
     
+    if len(playlists) <= 1:
+        results = [load(source) for source in playlists]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(MAX_SOURCE_WORKERS, len(playlists))) as pool:
+            results = list(pool.map(load, playlists))
+    results = [(source, events) for source, events in results if events is not None]
+    if playlists and not results:
+        # Never publish empty match files because every playlist failed
+        raise RuntimeError("none of the playlists could be read")
+    return results
+
+def parse_eventos(playlists=DEFAULT_PLAYLISTS, logos=None, channels=None, resolved=None):
+    """Parse the M3U playlists and generate matches.
+    
+    Entries of the same match (same time and teams, ignoring case and
+    accents) are merged across playlists; a stream listed several times is
+    kept once. logos, channels and the resolved-logo cache are loaded here
+    unless the caller keeps them (generator_daemon.py).
+    """
+    if logos is None:
+        logos = load_logos()
+    if channels is None:
+        channels = load_channels()
+    
+    main_matches = {}
+    other_matches = {}
+    seen_links = {}
+    today = datetime.now().strftime("%Y-%m-%d")
+    
+    # find_logo() scans every logo on a miss: resolve each team once per run
+    if resolved is None:
+        resolved = {}
+    def logo_for(team_name, fallback):
+        key = (team_name, fallback)
+        if key not in resolved:
+            resolved[key] = find_logo(team_name, logos, fallback)
+        return resolved[key]
+    
+    duplicates = 0
+    for source, events in load_events(list(playlists)):
+        for time_str, competition, home_team, away_team, line_default, acestream_id in events:
+            match_key = (time_str, normalize(home_team), normalize(away_team))
+            
+            # Determine target dict
+            target = other_matches if is_excluded(competition) else main_matches
+            
+            if match_key not in target:
+                # Find logos (once per match, not per link)
+                home_logo = logo_for(home_team, line_default)
+                away_logo = logo_for(away_team, line_default)
+                target[match_key] = Match(time_str, today, home_team, away_team, home_logo, away_logo,
+                                          competition, f"acestream://{acestream_id}")
+                seen_links[id(target[match_key])] = set()
+            
+            match = target[match_key]
+            if acestream_id in seen_links[id(match)]:
+                duplicates += 1
+                continue
+            seen_links[id(match)].add(acestream_id)
+            
+            # Get channel name
+            channel_name = channels.get(acestream_id, default_name(acestream_id))
+            match.add_link(channel_name, acestream_id)
+    
+    if duplicates:
+        print(f"{duplicates} duplicate links dropped")
     return list(main_matches.values()), list(other_matches.values())
 
-def main():
+def add_logo_sprites(matches):
+    """Pack the local logos used by matches into atlases and attach their coordinates"""
+    import logo_atlas  # needs Pillow, only loaded in --atlas mode
+    
+    used = {LOGO_FILES[m[k]] for m in matches for k in ('home_logo', 'away_logo') if m[k] in LOGO_FILES}
+    sprites, sheets = logo_atlas.build_atlases(used)
+    for m in matches:
+        for side in ('home', 'away'):
+            path = LOGO_FILES.get(m[f'{side}_logo'])
+            if path in sprites:
+                m[f'{side}_logo_sprite'] = sprites[path]
+    total = sum(s['bytes'] for s in sheets)
+    print(f"Atlas: {len(sprites)} logos in {len(sheets)} sheet(s), {total / 1024:.0f} KiB")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate matches.json and matches_other.json from eventos.m3u")
+    parser.add_argument("playlists", nargs="*", default=list(DEFAULT_PLAYLISTS),
+                        help="local paths or http(s) URLs of M3U playlists (default: eventos.m3u)")
+    parser.add_argument("--atlas", action="store_true",
+                        help="pack the logos used today into sprite atlases (needs Pillow)")
+    parser.add_argument("--shards", action="store_true",
+                        help="also write per-date and per-competition slices to shards/")
+    parser.add_argument("--xmltv", metavar="PATH",
+                        help="also write an XMLTV guide (gzip-compressed if PATH ends in .gz)")
+    parser.add_argument("--m3u", metavar="PATH",
+                        help="also write an M3U playlist with logos and groups, plus one per competition in playlists/")
+    parser.add_argument("--minify", action="store_true", default=None,
+                        help="write compact JSON instead of indented (default: $TVSPORT_JSON_MINIFY)")
+    parser.add_argument("--merge-only", action="store_true",
+                        help="don't parse anything: rebuild the match files and their derived outputs "
+                             "from the partials of every pipeline")
+    return parser
+
+def write_derived(main_matches, other_matches, args, channels):
+    """Write the outputs derived from the published match files that args asks for"""
+    if args.shards:
+        import shards
+        with profiling.stage("shards"):
+            shards.write_shards(main_matches, other_matches)
+    
+    if args.xmltv:
+        import xmltv
+        with profiling.stage("xmltv"):
+            programmes = xmltv.write(canonical.canonicalize(main_matches + other_matches),
+                                     channels, args.xmltv)
+        print(f"{args.xmltv}: {programmes} programmes")
+    
+    if args.m3u:
+        import m3u
+        with profiling.stage("m3u"):
+            counts = m3u.write(canonical.canonicalize(main_matches + other_matches), args.m3u)
+        print(f"{args.m3u}: {sum(counts.values())} entries, {len(counts)} competition playlists")
+
+def merge_only(args):
+    """Rebuild the match files from every pipeline's partials, then their derived outputs"""
+    with publish.locked():
+        merged = publish.rebuild([MAIN_FILE, OTHER_FILE], minify=args.minify)
+    for target, matches in merged.items():
+        print(f"{target}: {len(matches)} matches")
+    write_derived(merged[MAIN_FILE], merged[OTHER_FILE], args, load_channels())
+
+def generate(args, logos=None, channels=None, resolved=None):
+    """Parse the playlists and write every output requested in args; returns (main, other) matches"""
     print("=== Generating matches ===")
     
-    main_matches, other_matches = parse_eventos()
+    if channels is None:
+        channels = load_channels()
+    with profiling.stage("parse"):
+        main_matches, other_matches = parse_eventos(args.playlists, logos, channels, resolved)
+    
+    if args.atlas:
+        with profiling.stage("atlas"):
+            add_logo_sprites(main_matches + other_matches)
     
-    # Save matches.json
-    with open('matches.json', 'w', encoding='utf-8') as f:
-        json.dump(main_matches, f, ensure_ascii=False, indent=2)
-    print(f"matches.json: {len(main_matches)} matches")
+    with profiling.stage("write"):
+        # Save matches.json and matches_other.json, merged with the other pipelines' partials
+        merged = publish.publish(SOURCE_NAME, {MAIN_FILE: main_matches, OTHER_FILE: other_matches},
+                                 minify=args.minify)
+        print(f"matches.json: {len(main_matches)} matches ({len(merged[MAIN_FILE])} with the other sources)")
+        print(f"matches_other.json: {len(other_matches)} matches "
+              f"({len(merged[OTHER_FILE])} with the other sources)")
     
-    # Save matches_other.json
-    with open('matches_other.json', 'w', encoding='utf-8') as f:
-        json.dump(other_matches, f, ensure_ascii=False, indent=2)
-    print(f"matches_other.json: {len(other_matches)} matches")
+    # Shards, guide and playlists describe the published files, not only this run
+    write_derived(merged[MAIN_FILE], merged[OTHER_FILE], args, channels)
     
     # Stats
-    main_with_logos = sum(1 for m in main_matches if 'tvsport/main/logos' in m['home_logo'])
-    other_with_logos = sum(1 for m in other_matches if 'tvsport/main/logos' in m['home_logo'])
+    main_with_logos = sum(1 for m in main_matches if m['home_logo'].startswith((LOGOS_URL, ASSETS_URL)))
+    other_with_logos = sum(1 for m in other_matches if m['home_logo'].startswith((LOGOS_URL, ASSETS_URL)))
     print(f"\nLogos stats:")
     print(f"  Main: {main_with_logos}/{len(main_matches)} with real logos")
     print(f"  Other: {other_with_logos}/{len(other_matches)} with real logos")
@@ -300,9 +453,18 @@ def main():
         print(f"  {m['competition']}: {m['home_team']} vs {m['away_team']}")
     
     print(f"\nOther matches competitions:")
-    comps = set(m['competition'] for m in other_matches)
+    comps = sorted(set(m['competition'] for m in other_matches))
     for c in comps:
         print(f"  - {c}")
+    
+    return main_matches, other_matches
+
+def main():
+    args = build_parser().parse_args()
+    if args.merge_only:
+        merge_only(args)
+    else:
+        generate(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    profiling.run(main)
\ No newline at end of file
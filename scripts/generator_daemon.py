@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Long-running generate_matches.py with warm indexes
+
+Keeps the logo index, the resolved team logos and the channel map in
+memory, polls the inputs (the local playlists, logos/,
+logo_assets/manifest.json and channel_mapping.json) and regenerates the
+outputs as soon as one of them changes. Only what changed is reloaded:
+an edited eventos.m3u reuses every index, a new logo reloads the logo
+index, an edited mapping reloads the channel map.
+
+A unix socket ($TVSPORT_CACHE_DIR/generator.sock) takes one command per
+connection and answers with JSON:
+
+  python scripts/generator_daemon.py run -- --shards --xmltv epg.xml.gz
+  python scripts/generator_daemon.py refresh   # regenerate now (remote playlists too)
+  python scripts/generator_daemon.py stats
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+import generate_matches
+
+# source_health.CACHE_DIR, without importing requests
+SOCKET_PATH = os.path.join(os.environ.get("TVSPORT_CACHE_DIR") or ".cache", "generator.sock")
+POLL_INTERVAL = 0.5
+REFRESH_TIMEOUT = 120
+LOGO_INPUTS = ("logos", generate_matches.ASSETS_MANIFEST)
+CHANNEL_INPUTS = ("channel_mapping.json",)
+
+
+def snapshot(paths):
+    """{file: (mtime_ns, size)} of the given files and of every file under the given directories"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+        else:
+            files.append(path)
+    state = {}
+    for path in files:
+        # Missing, or removed since the walk (temp files of atomic writes): not an input
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+class Generator:
+    """generate_matches.generate() with its lookup data kept between runs"""
+
+    def __init__(self, args):
+        self.args = args
+        self.playlists = [p for p in args.playlists if not p.startswith(('http://', 'https://'))]
+        self.logos = self.channels = None
+        self.resolved = {}
+        self.seen = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.forced = False
+        self.started = time.time()
+        self.stats = {"runs": 0, "failures": 0, "last_run": None, "last_trigger": None,
+                      "last_duration_ms": None, "matches": 0, "matches_other": 0}
+
+    def changed(self):
+        """Names of the input groups that changed since the last check; reloads their indexes"""
+        groups = {"playlists": self.playlists, "logos": LOGO_INPUTS, "channels": CHANNEL_INPUTS}
+        changed = []
+        for name, paths in groups.items():
+            state = snapshot(paths)
+            if state != self.seen.get(name):
+                self.seen[name] = state
+                changed.append(name)
+        if "logos" in changed or self.logos is None:
+            generate_matches.LOGO_FILES.clear()
+            self.logos = generate_matches.load_logos()
+            self.resolved.clear()
+        if "channels" in changed or self.channels is None:
+            self.channels = generate_matches.load_channels()
+        return changed
+
+    def run(self, trigger):
+        start = time.perf_counter()
+        try:
+            main_matches, other_matches = generate_matches.generate(
+                self.args, self.logos, self.channels, self.resolved)
+        except Exception:
+            traceback.print_exc()
+            with self.lock:
+                self.stats["failures"] += 1
+            return
+        with self.lock:
+            self.stats.update(runs=self.stats["runs"] + 1, last_run=int(time.time()), last_trigger=trigger,
+                              last_duration_ms=round((time.perf_counter() - start) * 1000, 1),
+                              matches=len(main_matches), matches_other=len(other_matches))
+        print(f"[daemon] {trigger}: regenerated in {self.stats['last_duration_ms']} ms")
+
+    def snapshot_stats(self):
+        with self.lock:
+            return dict(self.stats, uptime=int(time.time() - self.started), logos=len(self.logos or ()),
+                        channels=len(self.channels or ()), resolved_logos=len(self.resolved))
+
+    def refresh(self):
+        """Force a run and wait for it; returns the stats after it"""
+        with self.lock:
+            runs = self.stats["runs"] + self.stats["failures"]
+            self.forced = True
+        self.wake.set()
+        deadline = time.time() + REFRESH_TIMEOUT
+        while time.time() < deadline:
+            stats = self.snapshot_stats()
+            if stats["runs"] + stats["failures"] > runs:
+                return stats
+            time.sleep(0.05)
+        return dict(self.snapshot_stats(), error="timeout")
+
+    def loop(self, interval=POLL_INTERVAL):
+        while True:
+            with self.lock:
+                forced, self.forced = self.forced, False
+            try:
+                changed = self.changed()
+            except Exception:
+                # e.g. a mapping caught mid-write: reload everything on the next check
+                traceback.print_exc()
+                self.seen.clear()
+                with self.lock:
+                    self.stats["failures"] += 1
+            else:
+                if forced or changed:
+                    self.run("refresh" if forced else "+".join(changed))
+            self.wake.wait(interval)
+            self.wake.clear()
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        command = self.rfile.readline().decode("utf-8").strip()
+        generator = self.server.generator
+        if command == "stats":
+            reply = generator.snapshot_stats()
+        elif command == "refresh":
+            reply = generator.refresh()
+        else:
+            reply = {"error": f"unknown command: {command!r}"}
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+def serve(generator, path):
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    server = socketserver.ThreadingUnixStreamServer(path, ControlHandler)
+    server.daemon_threads = True
+    server.generator = generator
+    threading.Thread(target=server.serve_forever, name="control-socket", daemon=True).start()
+    return server
+
+
+def send(command, path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(REFRESH_TIMEOUT + 5)
+        s.connect(path)
+        s.sendall(command.encode("utf-8") + b"\n")
+        return json.loads(s.makefile("rb").readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", default=SOCKET_PATH, help="control socket path")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="start the daemon")
+    run.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between input checks")
+    run.add_argument("generate_args", nargs=argparse.REMAINDER,
+                     help="generate_matches.py options (after --)")
+    sub.add_parser("refresh", help="regenerate now and print the stats")
+    sub.add_parser("stats", help="print the daemon stats")
+    args = parser.parse_args()
+
+    if args.command != "run":
+        try:
+            print(json.dumps(send(args.command, args.socket), indent=2))
+        except OSError as e:
+            print(f"cannot reach the daemon at {args.socket}: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    generate_args = args.generate_args[1:] if args.generate_args[:1] == ["--"] else args.generate_args
+    generator = Generator(generate_matches.build_parser().parse_args(generate_args))
+    server = serve(generator, args.socket)
+    print(f"[daemon] control socket: {args.socket}")
+    # systemd/docker stop with SIGTERM: still remove the socket
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        generator.loop(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
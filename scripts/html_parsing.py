@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Targeted HTML parsing for the scrapers
+
+Only the subtrees of elements carrying one of the requested classes are
+turned into a BeautifulSoup tree; the rest of the page is tokenized and
+dropped. lxml is used when installed (TVSPORT_HTML_PARSER overrides).
+"""
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+# Containers the footmercato and livetv selectors start from
+MATCH_CLASSES = ("match", "matchList__item")
+EVENT_CLASSES = ("event",)
+
+
+def parser_backend():
+    """Parser name handed to BeautifulSoup"""
+    return os.environ.get("TVSPORT_HTML_PARSER") or DEFAULT_PARSER
+
+
+def parse_nodes(content, classes, parser=None):
+    """Parse only the elements having one of `classes` (with their subtrees).
+
+    CSS selectors written against the full page keep working as long as they
+    start from one of those classes.
+    """
+    wanted = frozenset(classes)
+
+    def has_wanted_class(value):
+        # Checked before the builder splits multi-valued attributes
+        if not value:
+            return False
+        names = value.split() if isinstance(value, str) else value
+        return not wanted.isdisjoint(names)
+
+    strainer = SoupStrainer(class_=has_wanted_class)
+    return BeautifulSoup(content, parser or parser_backend(), parse_only=strainer)
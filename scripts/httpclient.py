@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared HTTP session with record/replay support
+
+TVSPORT_HTTP_MODE selects the transport:
+  live    (default) real network, pooled connections
+  record  real network, every response is also saved under TVSPORT_FIXTURES_DIR
+  replay  no network, responses are served from TVSPORT_FIXTURES_DIR
+
+In replay mode TVSPORT_REPLAY_LATENCY and TVSPORT_REPLAY_JITTER (seconds)
+delay each response so concurrency and caching changes can be benchmarked
+offline:
+
+  TVSPORT_HTTP_MODE=record python scripts/scrape_multi_sources.py
+  TVSPORT_HTTP_MODE=replay TVSPORT_REPLAY_LATENCY=0.3 python scripts/scrape_multi_sources.py
+
+Requests are paced per host and hedged by fetch_scheduler in every mode.
+"""
+import base64
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+import fetch_scheduler
+
+DEFAULT_FIXTURES_DIR = os.path.join("fixtures", "http")
+# Headers describing the wire encoding; the stored body is already decoded
+_WIRE_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+
+def fixtures_dir():
+    return os.environ.get("TVSPORT_FIXTURES_DIR") or DEFAULT_FIXTURES_DIR
+
+
+def fixture_path(method, url, root=None):
+    """Where the response to `method url` is stored"""
+    parts = urlsplit(url)
+    digest = hashlib.sha1(f"{method.upper()} {url}".encode("utf-8")).hexdigest()[:12]
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", parts.path + ("?" + parts.query if parts.query else "")).strip("_")
+    return os.path.join(root or fixtures_dir(), parts.hostname or "_", f"{method.upper()}_{slug[:60]}_{digest}.json")
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that also writes every response to the fixture directory"""
+
+    def __init__(self, root=None, **kwargs):
+        super().__init__(**kwargs)
+        self.root = root or fixtures_dir()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        path = fixture_path(request.method, request.url, self.root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            "method": request.method,
+            "url": request.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _WIRE_HEADERS},
+            "encoding": response.encoding,
+            "body_b64": base64.b64encode(response.content).decode("ascii"),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=1)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serve recorded responses, with optional latency and jitter"""
+
+    def __init__(self, root=None, latency=0.0, jitter=0.0, seed=None):
+        super().__init__()
+        self.root = root or fixtures_dir()
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def send(self, request, timeout=None, **kwargs):
+        with self.lock:
+            delay = self.latency + (self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        delay = max(0.0, delay)
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.Timeout(f"replay: {request.url} took longer than {read_timeout}s", request=request)
+        time.sleep(delay)
+
+        path = fixture_path(request.method, request.url, self.root)
+        if not os.path.exists(path):
+            raise requests.ConnectionError(f"replay: no fixture for {request.method} {request.url}", request=request)
+        with open(path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.reason = record.get("reason", "")
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response.encoding = record.get("encoding")
+        response.url = record["url"]
+        response.request = request
+        response._content = base64.b64decode(record["body_b64"])
+        return response
+
+    def close(self):
+        pass
+
+
+def _float_env(name):
+    return float(os.environ.get(name) or 0)
+
+
+def make_session(mode=None):
+    """New session wired for the given (or configured) transport mode"""
+    mode = (mode or os.environ.get("TVSPORT_HTTP_MODE") or "live").lower()
+    s = requests.Session()
+    if mode == "record":
+        adapter = RecordingAdapter()
+    elif mode == "replay":
+        seed = os.environ.get("TVSPORT_REPLAY_SEED")
+        adapter = ReplayAdapter(latency=_float_env("TVSPORT_REPLAY_LATENCY"),
+                                jitter=_float_env("TVSPORT_REPLAY_JITTER"),
+                                seed=int(seed) if seed else None)
+    elif mode == "live":
+        adapter = HTTPAdapter(pool_maxsize=16)
+    else:
+        raise ValueError(f"unknown TVSPORT_HTTP_MODE: {mode}")
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session():
+    """Process-wide session, created on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+def get(url, **kwargs):
+    """GET through the shared session, paced and hedged by fetch_scheduler"""
+    return fetch_scheduler.scheduler().call(url, lambda: session().get(url, **kwargs))
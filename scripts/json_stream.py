@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming, atomic JSON array writer for the match files
+
+Records are encoded and written one at a time, so neither the full list of
+dicts nor the full output text is ever built; a generator can be passed
+straight through. The file is written next to its destination and renamed
+over it, so readers never see a half-written matches.json.
+
+    json_stream.dump(matches, "matches.json")               # indent=2
+    json_stream.dump(matches, "matches.json", minify=True)  # compact
+
+The encoder backend is orjson when it is installed, else the standard
+library; TVSPORT_JSON_ENCODER=json|orjson forces one. TVSPORT_JSON_MINIFY=1
+makes compact output the default.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+from models import to_json
+
+
+def _json_encoder(minify, default):
+    if minify:
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=default)
+    else:
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=2, default=default)
+    return lambda obj: encoder.encode(obj).encode('utf-8')
+
+
+def _orjson_encoder(minify, default):
+    import orjson
+    option = 0 if minify else orjson.OPT_INDENT_2
+    return lambda obj: orjson.dumps(obj, default=default, option=option)
+
+
+# name -> factory(minify, default) returning obj -> UTF-8 bytes
+ENCODERS = {
+    "json": _json_encoder,
+    "orjson": _orjson_encoder,
+}
+
+
+def default_encoder():
+    name = os.environ.get("TVSPORT_JSON_ENCODER")
+    if name:
+        return name
+    try:
+        import orjson  # noqa: F401
+        return "orjson"
+    except ImportError:
+        return "json"
+
+
+def default_minify():
+    return os.environ.get("TVSPORT_JSON_MINIFY", "").lower() in ("1", "true", "yes")
+
+
+def iter_array(records, minify=False, encoder=None, default=to_json):
+    """Yield the encoded chunks of a JSON array, one record at a time.
+
+    The indented form is byte-identical to json.dump(records, f, indent=2,
+    ensure_ascii=False).
+    """
+    encode = ENCODERS[encoder or default_encoder()](minify, default)
+    first = True
+    for record in records:
+        data = encode(record)
+        if minify:
+            yield (b'[' if first else b',') + data
+        else:
+            yield (b'[\n  ' if first else b',\n  ') + data.replace(b'\n', b'\n  ')
+        first = False
+    if first:
+        yield b'[]'
+    else:
+        yield b']' if minify else b'\n]'
+
+
+@contextmanager
+def atomic_file(path):
+    """Binary file that replaces path once the block completes without error"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def dump(records, path, minify=None, encoder=None, default=to_json):
+    """Atomically write records as a JSON array to path; returns the record count"""
+    if minify is None:
+        minify = default_minify()
+    count = 0
+
+    def counted():
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record
+
+    with atomic_file(path) as f:
+        for chunk in iter_array(counted(), minify, encoder, default):
+            f.write(chunk)
+    return count
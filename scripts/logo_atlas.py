@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pack the logos used by today's matches into sprite atlases
+
+Each atlas is a grid of CELL x CELL badges (COLUMNS per row, at most
+MAX_PER_ATLAS per sheet) saved as a lossless WebP named after its content,
+so the client fetches every badge of the day in one or a few requests and
+crops them with the coordinates stored on each match. Each badge is
+reduced to its own 256-colour palette (as build_logos.py does), never to
+one palette shared by the whole sheet.
+
+The atlases of the previous build are kept, so clients still holding the
+previous matches.json can fetch their sprites; older ones are removed.
+"""
+import hashlib
+import io
+import json
+import os
+
+from PIL import Image
+
+ATLAS_DIR = "logo_atlas"
+ATLAS_URL = "https://raw.githubusercontent.com/amouradore/tvsport/main/logo_atlas"
+CELL = 64
+COLUMNS = 16
+MAX_PER_ATLAS = 256
+
+
+def _render_cell(path):
+    img = Image.open(path).convert("RGBA")
+    img.thumbnail((CELL, CELL), Image.LANCZOS)
+    cell = Image.new("RGBA", (CELL, CELL), (0, 0, 0, 0))
+    cell.paste(img, ((CELL - img.width) // 2, (CELL - img.height) // 2))
+    # Flat artwork: a palette of its own is lossless to the eye and compresses far better
+    return cell.quantize(colors=256, method=Image.Quantize.FASTOCTREE).convert("RGBA")
+
+
+def _previous_atlases(out_dir):
+    """File names of the atlases listed by the last atlas.json"""
+    try:
+        with open(os.path.join(out_dir, "atlas.json"), "r", encoding="utf-8") as f:
+            return {sheet["url"].rsplit("/", 1)[-1] for sheet in json.load(f)["atlases"]}
+    except (OSError, ValueError, KeyError):
+        return set()
+
+
+def build_atlases(paths, out_dir=ATLAS_DIR, base_url=ATLAS_URL):
+    """Pack the given logo files; returns (sprites, sheets).
+
+    sprites maps each path to its sprite dict (atlas URL, x, y, w, h) and
+    sheets lists the atlases written. Atlases older than the previous
+    build are removed from out_dir.
+    """
+    paths = sorted(set(paths))
+    os.makedirs(out_dir, exist_ok=True)
+    keep = _previous_atlases(out_dir)
+
+    sprites = {}
+    sheets = []
+    for start in range(0, len(paths), MAX_PER_ATLAS):
+        chunk = paths[start:start + MAX_PER_ATLAS]
+        rows = (len(chunk) + COLUMNS - 1) // COLUMNS
+        sheet = Image.new("RGBA", (min(len(chunk), COLUMNS) * CELL, rows * CELL), (0, 0, 0, 0))
+        positions = {}
+        for i, path in enumerate(chunk):
+            x, y = (i % COLUMNS) * CELL, (i // COLUMNS) * CELL
+            sheet.paste(_render_cell(path), (x, y))
+            positions[path] = (x, y)
+
+        out = io.BytesIO()
+        sheet.save(out, "WEBP", lossless=True, method=4)
+        data = out.getvalue()
+        name = f"atlas-{hashlib.sha256(data).hexdigest()[:16]}.webp"
+        keep.add(name)
+        with open(os.path.join(out_dir, name), "wb") as f:
+            f.write(data)
+        url = f"{base_url}/{name}"
+        sheets.append({"url": url, "width": sheet.width, "height": sheet.height,
+                       "logos": len(chunk), "bytes": len(data)})
+        for path, (x, y) in positions.items():
+            sprites[path] = {"atlas": url, "x": x, "y": y, "w": CELL, "h": CELL}
+
+    for name in os.listdir(out_dir):
+        if name.startswith("atlas-") and name not in keep:
+            os.remove(os.path.join(out_dir, name))
+    with open(os.path.join(out_dir, "atlas.json"), "w", encoding="utf-8") as f:
+        json.dump({"cell": CELL, "atlases": sheets}, f, indent=2)
+    return sprites, sheets
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+M3U playlists from the parsed events
+
+Re-emits every link of every match as an #EXTINF entry carrying the logo
+already resolved for the match (tvg-logo), its competition (group-title)
+and the channel name from channel_mapping.json. The per-competition
+playlists are written in the same pass:
+
+    eventos_logos.m3u                  every match
+    playlists/<competition slug>.m3u   one competition
+
+Playlists of competitions that disappeared are deleted.
+"""
+import os
+from contextlib import ExitStack
+
+import json_stream
+from shards import unique_slugs
+
+PLAYLISTS_DIR = "playlists"
+
+
+def _attr(value):
+    return (value or "").replace('"', "'")
+
+
+def entries(m):
+    """#EXTINF + URL lines of a match, one pair per link"""
+    title = f"{m.time} {m.competition} - {m.home_team}"
+    if m.away_team:
+        title += f" - {m.away_team}"
+    for link in m.links:
+        yield (f'#EXTINF:-1 tvg-id="{link.acestream_id}" tvg-name="{_attr(link.channel_name)}" '
+               f'tvg-logo="{_attr(m.home_logo)}" group-title="{_attr(m.competition)}",'
+               f'{title} ({link.channel_name})\n'
+               f'acestream://{link.acestream_id}\n').encode("utf-8")
+
+
+def write(matches, path, playlists_dir=PLAYLISTS_DIR):
+    """Write the full playlist and one per competition; returns {competition: entries}"""
+    matches = list(matches)
+    slugs = unique_slugs(m.competition for m in matches)
+    counts = {}
+    names = set()
+    with ExitStack() as stack:
+        out = stack.enter_context(json_stream.atomic_file(path))
+        out.write(b"#EXTM3U\n")
+        playlists = {}
+        for m in matches:
+            if m.competition not in playlists:
+                name = f"{slugs[m.competition]}.m3u"
+                f = playlists[m.competition] = stack.enter_context(
+                    json_stream.atomic_file(os.path.join(playlists_dir, name)))
+                f.write(b"#EXTM3U\n")
+                names.add(name)
+                counts[m.competition] = 0
+            for entry in entries(m):
+                out.write(entry)
+                playlists[m.competition].write(entry)
+                counts[m.competition] += 1
+
+    if os.path.isdir(playlists_dir):
+        for name in os.listdir(playlists_dir):
+            if name.endswith(".m3u") and name not in names:
+                os.remove(os.path.join(playlists_dir, name))
+    return counts
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mirror remote team logos into a content-addressed local store
+
+Downloads every remote team logo once (team_logos_mapping.json, and the
+TheSportsDB badges found in scraped match files) into
+logo_store/<sha256[:2]>/<sha256>.<ext>. Identical images, including copies
+of the PNGs under logos/, are stored once. logo_store/index.json maps URLs
+and team names to hashes; get_team_logo() answers from it without touching
+the network, and --rewrite points team_logos_mapping.json at the mirror.
+Other logos of the match files (DEFAULT_LOGO, the playlist's tvg-logo
+icons) are generic pictures shared by many teams and are left out.
+
+  python scripts/mirror_logos.py --matches matches.json matches_other.json --rewrite
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import urllib.parse
+from functools import lru_cache
+
+from ace_ids import write_mapping
+from generate_matches import DEFAULT_LOGO, LOGOS_URL
+from models import normalize
+
+STORE_DIR = "logo_store"
+INDEX_FILE = os.path.join(STORE_DIR, "index.json")
+STORE_URL = "https://raw.githubusercontent.com/amouradore/tvsport/main/logo_store"
+MAPPING_FILE = "team_logos_mapping.json"
+OWN_URLS = ("https://raw.githubusercontent.com/amouradore/tvsport/",)
+SPORTSDB_HOST = "thesportsdb.com"
+
+
+def sniff_type(data, url=""):
+    """File extension for an image, from its magic bytes"""
+    head = data[:512].lstrip()
+    if data.startswith(b"\x89PNG"):
+        return "png"
+    if data.startswith(b"\xff\xd8"):
+        return "jpg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[:4] == b"GIF8":
+        return "gif"
+    if head.startswith(b"<?xml") or b"<svg" in head:
+        return "svg"
+    ext = os.path.splitext(urllib.parse.urlsplit(url).path)[1].lower().lstrip(".")
+    return ext or "bin"
+
+
+def load_index(path=INDEX_FILE):
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"version": 1, "objects": {}, "urls": {}, "teams": {}}
+
+
+def object_url(index, digest, store_url=STORE_URL):
+    """Public URL of a stored object"""
+    obj = index["objects"][digest]
+    if obj.get("local"):
+        league, fname = obj["local"].split("/", 1)
+        return f"{LOGOS_URL}/{urllib.parse.quote(league)}/{urllib.parse.quote(fname)}"
+    return f"{store_url}/{obj['path']}"
+
+
+@lru_cache(maxsize=1)
+def _team_index():
+    index = load_index()
+    return {team: object_url(index, digest) for team, digest in index.get("teams", {}).items()}
+
+
+def mirrored_logo(team_name):
+    """Mirrored logo URL for a team, or None (no network access)"""
+    return _team_index().get(normalize(team_name))
+
+
+def store(index, data, url="", store_dir=STORE_DIR):
+    """Add data to the store (once per content), return its hash"""
+    digest = hashlib.sha256(data).hexdigest()
+    if digest not in index["objects"]:
+        ext = sniff_type(data, url)
+        rel = f"{digest[:2]}/{digest}.{ext}"
+        os.makedirs(os.path.join(store_dir, digest[:2]), exist_ok=True)
+        with open(os.path.join(store_dir, rel), "wb") as f:
+            f.write(data)
+        index["objects"][digest] = {"path": rel, "bytes": len(data), "type": ext}
+    return digest
+
+
+def index_local_logos(index, logos_dir="logos"):
+    """Hash logos/ so remote copies of them dedupe against the repo files"""
+    duplicates = 0
+    if not os.path.isdir(logos_dir):
+        return duplicates
+    for league in sorted(os.listdir(logos_dir)):
+        league_path = os.path.join(logos_dir, league)
+        if not os.path.isdir(league_path):
+            continue
+        for fname in sorted(os.listdir(league_path)):
+            if not fname.endswith(".png"):
+                continue
+            with open(os.path.join(league_path, fname), "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            existing = index["objects"].get(digest)
+            if existing:
+                duplicates += existing.get("local") != f"{league}/{fname}"
+                continue
+            index["objects"][digest] = {"local": f"{league}/{fname}", "type": "png"}
+    return duplicates
+
+
+def _is_remote(url):
+    return url.startswith("http") and not url.startswith(OWN_URLS) and url != DEFAULT_LOGO
+
+
+def _from_sportsdb(url):
+    host = urllib.parse.urlsplit(url).hostname or ""
+    return host == SPORTSDB_HOST or host.endswith("." + SPORTSDB_HOST)
+
+
+def collect_remote(mapping, match_files):
+    """{url: set(team names)} for every remote team logo worth mirroring
+
+    Only curated logos (team_logos_mapping.json) and TheSportsDB badges
+    are team logos; the other remote logos of the match files are fallbacks.
+    """
+    wanted = {}
+    curated = set(mapping.values())
+    for team, url in mapping.items():
+        if _is_remote(url):
+            wanted.setdefault(url, set()).add(team)
+    for path in match_files:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for match in json.load(f):
+                for side in ("home", "away"):
+                    url = match.get(f"{side}_logo") or ""
+                    team = match.get(f"{side}_team") or ""
+                    if team and _is_remote(url) and (url in curated or _from_sportsdb(url)):
+                        wanted.setdefault(url, set()).add(team)
+    return wanted
+
+
+def team_digests(index, mapping):
+    """Hashes that may stand for a team: curated logos (mirrored or not) and TheSportsDB badges"""
+    by_url = {object_url(index, digest): digest for digest in index["objects"]}
+    digests = {index["urls"].get(url) or by_url.get(url) for url in mapping.values()}
+    digests.update(digest for url, digest in index["urls"].items() if _from_sportsdb(url))
+    return digests - {None, index["urls"].get(DEFAULT_LOGO)}
+
+
+def mirror(match_files, rewrite=False, workers=8):
+    import sources
+
+    index = load_index()
+    os.makedirs(STORE_DIR, exist_ok=True)
+    local_dupes = index_local_logos(index)
+
+    mapping = {}
+    if os.path.exists(MAPPING_FILE):
+        with open(MAPPING_FILE, "r", encoding="utf-8-sig") as f:
+            mapping = json.load(f)
+    wanted = collect_remote(mapping, match_files)
+    todo = sorted(url for url in wanted if url not in index["urls"])
+    print(f"{len(wanted)} remote logos, {len(todo)} not mirrored yet")
+
+    def download(url):
+        try:
+            response = sources.fetch(url, timeout=10)
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            print(f"  ❌ {url}: {e}")
+            return None
+
+    fetched = 0
+    for url, data in zip(todo, sources.map_concurrent(download, todo, workers)):
+        if data:
+            index["urls"][url] = store(index, data, url)
+            fetched += 1
+
+    for url, teams in wanted.items():
+        if url in index["urls"]:
+            for team in teams:
+                index["teams"][normalize(team)] = index["urls"][url]
+    # Generic icons recorded as team logos by earlier runs would hide the real badge
+    allowed = team_digests(index, mapping)
+    generic = [team for team, digest in index["teams"].items() if digest not in allowed]
+    for team in generic:
+        del index["teams"][team]
+
+    distinct = len(set(index["urls"].values()))
+    print(f"Downloaded {fetched}, {len(index['urls'])} URLs -> {distinct} distinct images "
+          f"({len(index['urls']) - distinct} duplicates), {local_dupes} duplicate PNGs in logos/, "
+          f"{len(generic)} generic team logos dropped")
+
+    with open(INDEX_FILE + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(INDEX_FILE + ".tmp", INDEX_FILE)
+
+    if rewrite and mapping:
+        changed = 0
+        for team, url in mapping.items():
+            if url in index["urls"]:
+                local = object_url(index, index["urls"][url])
+                changed += local != url
+                mapping[team] = local
+        if changed:
+            # Same layout as the curated file, so the diff shows only the rewritten URLs
+            write_mapping(mapping, MAPPING_FILE)
+        print(f"{MAPPING_FILE}: {changed} references rewritten to the mirror")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--matches", nargs="*", default=["matches.json", "matches_other.json"],
+                        help="match files whose remote home/away logos should be mirrored")
+    parser.add_argument("--rewrite", action="store_true",
+                        help=f"point {MAPPING_FILE} at the mirrored copies")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    return mirror(args.matches, args.rewrite, args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Match and Link records shared by every pipeline
+
+Match uses __slots__ and interned strings (team, competition, channel and
+logo strings repeat across thousands of events), and is only turned into a
+dict when it is serialized. It also answers m['home_team'], m.get('time')
+and m['x'] = ... like the dicts the scripts used to pass around, so code
+written against dicts keeps working. m['links'] is a read-only tuple of
+dicts built on each read: add links with m.add_link() or replace them
+with m['links'] = [...].
+
+    json.dump(matches, f, default=models.to_json)
+"""
+import sys
+import unicodedata
+from typing import NamedTuple
+
+_intern = sys.intern
+
+# Serialization order of the fields in matches.json
+FIELDS = ('time', 'date', 'home_team', 'away_team', 'home_logo', 'away_logo',
+          'competition', 'link', 'channels', 'links')
+
+
+def normalize(s):
+    """Remove accents and lowercase (the key teams and competitions are compared on)"""
+    s = unicodedata.normalize('NFD', s)
+    s = ''.join(c for c in s if unicodedata.category(c) != 'Mn')
+    return s.lower().strip()
+
+
+class Link(NamedTuple):
+    channel_name: str
+    acestream_id: str
+
+    def to_dict(self):
+        return {'channel_name': self.channel_name, 'acestream_id': self.acestream_id}
+
+
+def _s(value):
+    return _intern(value) if value else ''
+
+
+class Match:
+    __slots__ = ('time', 'date', 'home_team', 'away_team', 'home_logo', 'away_logo',
+                 'competition', 'link', '_channels', 'links', 'extra')
+
+    def __init__(self, time, date, home_team, away_team, home_logo='', away_logo='',
+                 competition='', link='', channels=None, links=None):
+        self.time = _s(time)
+        self.date = _s(date)
+        self.home_team = _s(home_team)
+        self.away_team = _s(away_team)
+        self.home_logo = _s(home_logo)
+        self.away_logo = _s(away_logo)
+        self.competition = _s(competition)
+        self.link = _s(link)
+        # None = derived from links when read
+        self._channels = [_s(c) for c in channels] if channels is not None else None
+        self.links = list(links) if links else []
+        self.extra = None
+
+    def add_link(self, channel_name, acestream_id):
+        self.links.append(Link(_s(channel_name), _s(acestream_id)))
+
+    @property
+    def channels(self):
+        if self._channels is None:
+            return [l.channel_name for l in self.links]
+        return self._channels
+
+    @channels.setter
+    def channels(self, value):
+        self._channels = [_s(c) for c in value] if value is not None else None
+
+    # Dict-style access for code written against the old dict records
+    def __getitem__(self, key):
+        if key in FIELDS:
+            value = getattr(self, key)
+            # A tuple, so m['links'].append(...) fails instead of being lost
+            return tuple(l.to_dict() for l in value) if key == 'links' else value
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'links':
+            self.links = [l if isinstance(l, Link) else Link(_s(l['channel_name']), _s(l['acestream_id']))
+                          for l in value]
+        elif key in FIELDS:
+            setattr(self, key, _s(value) if isinstance(value, str) else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in FIELDS or bool(self.extra and key in self.extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        d = {
+            'time': self.time,
+            'date': self.date,
+            'home_team': self.home_team,
+            'away_team': self.away_team,
+            'home_logo': self.home_logo,
+            'away_logo': self.away_logo,
+            'competition': self.competition,
+            'link': self.link,
+            'channels': self.channels,
+            'links': [l.to_dict() for l in self.links],
+        }
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    @classmethod
+    def from_dict(cls, d):
+        m = cls(d.get('time', ''), d.get('date', ''), d.get('home_team', ''), d.get('away_team', ''),
+                d.get('home_logo', ''), d.get('away_logo', ''), d.get('competition', ''), d.get('link', ''),
+                d.get('channels'),
+                [Link(_s(l['channel_name']), _s(l['acestream_id'])) for l in d.get('links') or []])
+        for key, value in d.items():
+            if key not in FIELDS:
+                m[key] = value
+        return m
+
+    def __repr__(self):
+        return f"Match({self.time} {self.competition!r}: {self.home_team!r} - {self.away_team!r}, {len(self.links)} links)"
+
+
+def to_json(obj):
+    """json `default=` hook serializing Match records"""
+    if isinstance(obj, Match):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in profiling for the pipeline scripts
+
+Enable with TVSPORT_PROFILE=1 or by passing --profile to any entry point.
+Every stage writes three files into TVSPORT_PROFILE_DIR (default: profiles/):
+  <script>.<stage>.prof       cProfile stats (pstats, snakeviz)
+  <script>.<stage>.alloc.txt  tracemalloc top allocations
+  <script>.<stage>.folded     collapsed stacks (flamegraph.pl, speedscope)
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_ENV = "TVSPORT_PROFILE"
+PROFILE_DIR_ENV = "TVSPORT_PROFILE_DIR"
+SAMPLE_INTERVAL_ENV = "TVSPORT_PROFILE_INTERVAL"
+TOP_ALLOCATIONS = 25
+
+_active = threading.local()
+
+
+def enabled():
+    """True when profiling was requested via env var or --profile"""
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+def _script_name():
+    name = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+    return name or "python"
+
+
+def _output_dir():
+    path = os.environ.get(PROFILE_DIR_ENV) or "profiles"
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class StackSampler(threading.Thread):
+    """Sample every thread's stack at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, interval):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _write_allocations(snapshot, path):
+    import tracemalloc
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    stats = snapshot.statistics("lineno")
+    total = sum(stat.size for stat in stats)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Total traced: {total / 1024:.1f} KiB in {len(stats)} lines\n\n")
+        for i, stat in enumerate(stats[:TOP_ALLOCATIONS], 1):
+            frame = stat.traceback[0]
+            f.write(f"#{i} {frame.filename}:{frame.lineno}: "
+                    f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+
+
+@contextmanager
+def stage(name):
+    """Profile the enclosed block as one stage; no-op unless profiling is enabled.
+
+    Nested stages are folded into the outermost one.
+    """
+    if not enabled() or getattr(_active, "stage", None):
+        yield
+        return
+
+    # Loaded only when profiling: every entry point imports this module
+    import cProfile
+    import tracemalloc
+
+    _active.stage = name
+    prefix = os.path.join(_output_dir(), f"{_script_name()}.{name}")
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    sampler = StackSampler(float(os.environ.get(SAMPLE_INTERVAL_ENV) or 0.005))
+    sampler.start()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        _active.stage = None
+
+        profiler.dump_stats(prefix + ".prof")
+        _write_allocations(snapshot, prefix + ".alloc.txt")
+        sampler.write(prefix + ".folded")
+        print(f"[profile] {name}: {elapsed:.3f}s, peak {peak / 1024 / 1024:.1f} MiB -> {prefix}.*")
+
+
+def run(main):
+    """Run an entry point, turning a --profile argument into TVSPORT_PROFILE=1"""
+    if "--profile" in sys.argv[1:]:
+        sys.argv = [arg for arg in sys.argv if arg != "--profile"]
+        os.environ[PROFILE_ENV] = "1"
+    return main()
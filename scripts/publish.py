@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lock-protected publishing of the match files, merged from per-source partials
+
+Several pipelines publish matches.json (generate_matches.py from
+eventos.m3u, scrape_multi_sources.py, ...). Instead of overwriting each
+other, each one stores its own result as a partial and the published file
+is the merge of every partial:
+
+    partials/matches/<source>.json          one pipeline's matches.json
+    partials/matches_other/<source>.json
+
+publish() takes an exclusive lock (.publish.lock next to the targets),
+writes the partials atomically, then merges and writes every target with
+canonical.write(), so two pipelines running at once on the same checkout
+never clobber each other or interleave. The same match from several
+sources (same date, time and teams, ignoring case and accents) keeps the
+fields of the first source by name and gains the links of the others.
+Partials older than PARTIAL_MAX_AGE are left out of the merge. An empty
+result is published like any other: a source whose fetches fail already
+returns its last good result (source_health), so [] means no matches.
+
+After pulling the other pipelines' partials (CI), the targets are rebuilt
+without scraping anything:
+
+  python scripts/publish.py merge matches.json matches_other.json
+
+(generate_matches.py --merge-only does the same and also rebuilds the
+shards, guide and playlists derived from the two files.)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import canonical
+import json_stream
+import time_index
+from models import Match, normalize, to_json
+
+PARTIALS_DIR = "partials"
+LOCK_NAME = ".publish.lock"
+LOCK_TIMEOUT = 300
+PARTIAL_MAX_AGE = 24 * 3600
+
+
+@contextmanager
+def locked(directory=".", timeout=LOCK_TIMEOUT):
+    """Exclusive lock shared by every publisher of the files in directory"""
+    path = os.path.join(directory or ".", LOCK_NAME)
+    with open(path, "a+b") as f:
+        try:
+            import fcntl
+        except ImportError:  # Windows
+            import msvcrt
+            acquire = lambda: msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)  # noqa: E731
+            release = lambda: msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)  # noqa: E731
+        else:
+            acquire = lambda: fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)  # noqa: E731
+            release = lambda: fcntl.flock(f, fcntl.LOCK_UN)  # noqa: E731
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                acquire()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{path} still locked after {timeout}s")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            release()
+
+
+def partial_path(target, source):
+    stem = os.path.splitext(os.path.basename(target))[0]
+    return os.path.join(os.path.dirname(target), PARTIALS_DIR, stem, f"{source}.json")
+
+
+def write_partial(target, source, matches, now=None):
+    with json_stream.atomic_file(partial_path(target, source)) as f:
+        f.write(json.dumps({"source": source, "generated_at": int(now or time.time()),
+                            "matches": matches}, default=to_json, ensure_ascii=False).encode("utf-8"))
+
+
+def load_partials(target, now=None, max_age=PARTIAL_MAX_AGE):
+    """{source: matches} of the fresh partials of target"""
+    directory = os.path.dirname(partial_path(target, "_"))
+    now = now or time.time()
+    partials = {}
+    if not os.path.isdir(directory):
+        return partials
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: partial {name} ignored: {e}")
+            continue
+        if now - data.get("generated_at", 0) > max_age:
+            print(f"Partial {name}: plus vieux que {max_age // 3600} h, ignoré")
+            continue
+        matches = [Match.from_dict(d) for d in data["matches"]]
+        for m in matches:
+            # Channels derived from the links were written out explicitly: derive them again
+            if m._channels == [l.channel_name for l in m.links]:
+                m._channels = None
+        partials[data.get("source") or name[:-5]] = matches
+    return partials
+
+
+def merge(partials):
+    """Matches of every partial, in source-name order, one per (date, time, teams)"""
+    merged = {}
+    for source in sorted(partials):
+        for m in partials[source]:
+            key = (m.date, m.time, normalize(m.home_team), normalize(m.away_team))
+            first = merged.get(key)
+            if first is None:
+                merged[key] = m
+                continue
+            for link in m.links:
+                first.add_link(link.channel_name, link.acestream_id)
+            if first._channels is not None or m._channels is not None:
+                first.channels = list(first.channels) + list(m.channels)
+    return list(merged.values())
+
+
+def rebuild(targets, minify=None):
+    """Merge the partials of every target and write it; returns {target: merged matches}
+
+    Targets are always in canonical.match_key order, whichever pipeline
+    rebuilds them, so their content hash does not depend on the last one.
+    """
+    merged = {}
+    for target in targets:
+        merged[target] = canonical.canonicalize(merge(load_partials(target)))
+        canonical.write(merged[target], target, minify=minify)
+    return merged
+
+
+def publish(source, outputs, key=canonical.match_key, minify=None):
+    """Store outputs ({target path: matches}) as the partials of source and republish the targets.
+
+    key only orders the source's own partials; the targets keep the
+    canonical order (rebuild()). Returns {target: merged matches}, what the
+    targets now hold: outputs derived from a target (shards, guides...)
+    should be built from these.
+    """
+    directories = {os.path.dirname(target) for target in outputs}
+    if len(directories) != 1:
+        raise ValueError("publish() takes targets of a single directory")
+    with locked(directories.pop()):
+        for target, matches in outputs.items():
+            # Canonical and annotated in place, as canonical.write() leaves them for the caller
+            matches = canonical.canonicalize(matches, key)
+            time_index.annotate(matches)
+            write_partial(target, source, matches)
+        return rebuild(outputs, minify)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    merge_cmd = sub.add_parser("merge", help="rebuild targets from their partials")
+    merge_cmd.add_argument("targets", nargs="+")
+    merge_cmd.add_argument("--minify", action="store_true", default=None)
+    args = parser.parse_args()
+
+    directories = {os.path.dirname(target) for target in args.targets}
+    for directory in directories:
+        targets = [t for t in args.targets if os.path.dirname(t) == directory]
+        with locked(directory):
+            for target, matches in rebuild(targets, minify=args.minify).items():
+                print(f"{target}: {len(matches)} matchs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
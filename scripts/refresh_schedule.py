@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kickoff-aware refresh scheduler
+
+Reads the kickoff times in matches.json and decides how often sources should
+be refreshed: often around kickoff (when links change), rarely when nothing
+is on. Usage:
+
+  python scripts/refresh_schedule.py next                  # print the decision as JSON
+  python scripts/refresh_schedule.py should-run --last-run EPOCH   # exit 0 if due, 1 otherwise
+  python scripts/refresh_schedule.py daemon -- python scripts/generate_matches.py
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from feedtime import kickoff_epoch
+
+STATE_FILE = os.path.join(".cache", "refresh_state.json")
+
+# (start offset, end offset, interval) in minutes relative to each kickoff,
+# hottest window first
+WINDOWS = [
+    (-30, 15, 5),     # lineups, last-minute streams
+    (15, 120, 10),    # match in progress
+    (-180, -30, 20),  # build-up
+]
+QUIET_INTERVAL = 60   # nothing scheduled nearby
+# Cron can fire a bit early; treat runs within this margin as due
+TOLERANCE = 60
+
+
+def load_kickoffs(paths):
+    """Kickoff epochs of every match in the given JSON files"""
+    kickoffs = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            try:
+                matches = json.load(f)
+            except ValueError:
+                print(f"WARNING: {path} is not valid JSON", file=sys.stderr)
+                continue
+        for match in matches:
+            epoch = kickoff_epoch(match)
+            if epoch is not None:
+                kickoffs.append(epoch)
+    return sorted(kickoffs)
+
+
+def decide(kickoffs, now):
+    """Return (interval_seconds, next_run_epoch, reason) for the given time"""
+    interval = QUIET_INTERVAL * 60
+    reason = "quiet"
+
+    for start, end, minutes in WINDOWS:
+        for ko in kickoffs:
+            lo, hi = ko + start * 60, ko + end * 60
+            if lo <= now < hi:
+                if minutes * 60 < interval:
+                    interval = minutes * 60
+                    reason = f"kickoff {time.strftime('%H:%M', time.gmtime(ko))} UTC {start:+d}..{end:+d} min"
+                break
+
+    next_run = now + interval
+    # Wake up early if a hotter window opens before the next run
+    for start, _, minutes in WINDOWS:
+        if minutes * 60 >= interval:
+            continue
+        for ko in kickoffs:
+            lo = ko + start * 60
+            if now < lo < next_run:
+                next_run = lo
+                reason += f", window opens at {time.strftime('%H:%M', time.gmtime(lo))} UTC"
+                break
+
+    return interval, int(next_run), reason
+
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def mark_run(source, now):
+    state = load_state()
+    state[source] = int(now)
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    with open(STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+
+def is_due(kickoffs, last_run, now):
+    """True if a run is due given the previous run time (None = never ran)"""
+    if last_run is None:
+        return True
+    interval, _, _ = decide(kickoffs, now)
+    return now + TOLERANCE >= last_run + interval
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--matches", nargs="+", default=["matches.json", "matches_other.json"],
+                        help="match files whose kickoffs drive the schedule")
+    parser.add_argument("--source", default="default", help="name used in the state file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("next", help="print the next-run decision as JSON")
+
+    should = sub.add_parser("should-run", help="exit 0 if a refresh is due, 1 otherwise")
+    should.add_argument("--last-run", type=int, help="epoch of the previous run (default: state file)")
+    should.add_argument("--mark", action="store_true", help="record this run in the state file when due")
+
+    daemon = sub.add_parser("daemon", help="run a command whenever a refresh is due")
+    daemon.add_argument("cmd", nargs=argparse.REMAINDER, help="command to run (after --)")
+
+    args = parser.parse_args()
+    now = time.time()
+
+    if args.command == "next":
+        kickoffs = load_kickoffs(args.matches)
+        interval, next_run, reason = decide(kickoffs, now)
+        print(json.dumps({
+            "now": int(now),
+            "interval": interval,
+            "next_run": next_run,
+            "sleep": max(0, next_run - int(now)),
+            "reason": reason,
+        }))
+        return 0
+
+    if args.command == "should-run":
+        last_run = args.last_run if args.last_run is not None else load_state().get(args.source)
+        due = is_due(load_kickoffs(args.matches), last_run, now)
+        print("due" if due else "skip")
+        if due and args.mark:
+            mark_run(args.source, now)
+        return 0 if due else 1
+
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        parser.error("daemon needs a command to run")
+    while True:
+        print(f"[scheduler] running: {' '.join(cmd)}")
+        subprocess.call(cmd)
+        mark_run(args.source, time.time())
+        # Re-read after every run: the command usually rewrites matches.json
+        _, next_run, reason = decide(load_kickoffs(args.matches), time.time())
+        print(f"[scheduler] next run in {max(0, next_run - time.time()):.0f}s ({reason})")
+        time.sleep(max(0, next_run - time.time()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
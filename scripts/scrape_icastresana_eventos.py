@@ -1,16 +1,46 @@
-﻿import requests
-import json
-import re
+﻿import re
 from datetime import datetime
-from collections import defaultdict
+
+import canonical
+import mirror_logos
+import profiling
+import publish
+import source_health
+from models import Match
+
+# Équipes mises en tête de liste, dans cet ordre
+PRIORITY_TEAMS = [
+    'Real Madrid', 'FC Barcelona', 'Barcelona', 'Barça',
+    'Manchester United', 'Paris Saint-Germain', 'PSG',
+    'Manchester City', 'Juventus', 'Chelsea', 'Liverpool',
+    'Bayern Munich', 'Arsenal', 'Al-Nassr', 'Al-Ahly', 'Al-Hilal'
+]
+
+def get_priority(match):
+    home = match.home_team.lower()
+    away = match.away_team.lower()
+    
+    for idx, team in enumerate(PRIORITY_TEAMS):
+        team_lower = team.lower()
+        if team_lower in home or team_lower in away:
+            return idx
+    return 999  # Équipes non prioritaires à la fin
+
+def priority_key(match):
+    """Trier par priorité d'équipes, puis dans l'ordre canonique"""
+    return (get_priority(match),) + canonical.match_key(match)
 
 def get_team_logo(team_name):
     '''Récupérer le vrai logo d'une équipe via TheSportsDB API'''
+    # Copie locale déjà connue (mirror_logos.py) : pas d'appel réseau
+    mirrored = mirror_logos.mirrored_logo(team_name)
+    if mirrored:
+        return mirrored
     try:
         # Nettoyer le nom de l'équipe
         clean_name = team_name.strip()
         url = f"https://www.thesportsdb.com/api/v1/json/3/searchteams.php?t={clean_name}"
-        response = requests.get(url, timeout=5)
+        response = source_health.get(url, timeout=5)
         data = response.json()
         
         if data.get('teams') and len(data['teams']) > 0:
@@ -29,7 +59,7 @@ def parse_icastresana_eventos():
     eventos_url = "https://raw.githubusercontent.com/Icastresana/lista1/main/eventos.m3u"
     
     try:
-        response = requests.get(eventos_url, timeout=10)
+        response = source_health.get(eventos_url, timeout=10)
         response.raise_for_status()
         content = response.text
         
@@ -38,16 +68,7 @@ def parse_icastresana_eventos():
         today = datetime.now().strftime("%Y-%m-%d")
         
         # Dictionnaire pour regrouper les matches identiques
-        matches_dict = defaultdict(lambda: {
-            'time': '',
-            'date': today,
-            'home_team': '',
-            'away_team': '',
-            'home_logo': '',
-            'away_logo': '',
-            'competition': '',
-            'links': []
-        })
+        matches_dict = {}
         
         while i < len(lines):
             line = lines[i].strip()
@@ -104,18 +125,13 @@ def parse_icastresana_eventos():
                                             channel_name = name_match.group(1)
                                     
                                     # Ajouter/mettre à jour le match
-                                    match_data = matches_dict[match_key]
-                                    if not match_data['time']:
-                                        match_data['time'] = time_str
-                                        match_data['home_team'] = home_team
-                                        match_data['away_team'] = away_team
-                                        match_data['competition'] = competition
+                                    match_data = matches_dict.get(match_key)
+                                    if match_data is None:
+                                        match_data = matches_dict[match_key] = Match(
+                                            time_str, today, home_team, away_team, competition=competition)
                                     
                                     # Ajouter le lien
-                                    match_data['links'].append({
-                                        'channel_name': channel_name,
-                                        'acestream_id': acestream_id
-                                    })
+                                    match_data.add_link(channel_name, acestream_id)
                                     
                                     i += 2
                                     continue
@@ -134,56 +150,43 @@ def parse_icastresana_eventos():
                 home_logo = "https://i.ibb.co/2vhFM7h/soccer-ball-variant.png"
                 away_logo = "https://i.ibb.co/2vhFM7h/soccer-ball-variant.png"
             
-            match_data['home_logo'] = home_logo
-            match_data['away_logo'] = away_logo
-            match_data['date'] = today
+            match_data.home_logo = home_logo
+            match_data.away_logo = away_logo
             
             # Ajouter link par défaut (premier lien) pour compatibilité
-            if match_data['links']:
-                match_data['link'] = f"acestream://{match_data['links'][0]['acestream_id']}"
-                match_data['channels'] = [link['channel_name'] for link in match_data['links']]
+            if match_data.links:
+                match_data.link = f"acestream://{match_data.links[0].acestream_id}"
             
             matches.append(match_data)
         
-        # Trier par priorité d'équipes
-        priority_teams = [
-            'Real Madrid', 'FC Barcelona', 'Barcelona', 'Barça',
-            'Manchester United', 'Paris Saint-Germain', 'PSG',
-            'Manchester City', 'Juventus', 'Chelsea', 'Liverpool',
-            'Bayern Munich', 'Arsenal', 'Al-Nassr', 'Al-Ahly', 'Al-Hilal'
-        ]
-        
-        def get_priority(match):
-            home = match['home_team'].lower()
-            away = match['away_team'].lower()
-            
-            for idx, team in enumerate(priority_teams):
-                team_lower = team.lower()
-                if team_lower in home or team_lower in away:
-                    return idx
-            return 999  # Équipes non prioritaires à la fin
-        
-        matches.sort(key=lambda m: (get_priority(m), m['time']))
-        
+        matches = canonical.canonicalize(matches, priority_key)
+        source_health.save_last_good("icastresana", matches)
         return matches
     
+    except source_health.CircuitOpenError as e:
+        matches = source_health.load_last_good("icastresana")
+        print(f"Icastresana ignoré ({e}), {len(matches)} matches servis depuis le cache")
+        return matches
     except Exception as e:
         print(f"Erreur: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        matches = source_health.load_last_good("icastresana")
+        print(f"{len(matches)} matches servis depuis le cache")
+        return matches
 
 def main():
     print("Parsing des événements Icastresana...")
-    matches = parse_icastresana_eventos()
+    with profiling.stage("parse"):
+        matches = parse_icastresana_eventos()
     
-    with open("matches.json", "w", encoding="utf-8") as f:
-        json.dump(matches, f, ensure_ascii=False, indent=2)
+    with profiling.stage("write"):
+        publish.publish("icastresana", {"matches.json": matches}, key=priority_key)
     
     print(f"OK: {len(matches)} matches uniques sauvegardés")
     
     for i, match in enumerate(matches[:10]):
-        print(f"{i+1}. {match['time']} - {match['home_team']} vs {match['away_team']} ({len(match['links'])} liens)")
+        print(f"{i+1}. {match['time']} - {match['home_team']} vs {match['away_team']} ({len(match.links)} liens)")
 
 if __name__ == "__main__":
-    main()
+    profiling.run(main)
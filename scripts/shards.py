@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-date and per-competition slices of the match files
+
+Clients that only follow one competition (or one day) fetch
+shards/index.json and then just the slices they need:
+
+    shards/date/<date>.json            main feed matches of that day
+    shards/date/<date>.other.json      matches_other.json matches of that day
+    shards/competition/<slug>.json     every match of one competition
+
+index.json lists every shard with its feed (main/other), match count, size
+and content hash; paths are relative to base_url. Shards whose content did
+not change are not rewritten, and shards that are no longer listed are
+deleted.
+"""
+import hashlib
+import json
+import os
+import re
+
+import canonical
+import json_stream
+from models import normalize
+
+SHARDS_DIR = "shards"
+BASE_URL = "https://raw.githubusercontent.com/amouradore/tvsport/main/shards"
+INDEX_VERSION = 1
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', normalize(name)).strip('-') or "sin-competicion"
+
+
+def unique_slugs(names):
+    """{name: slug}; names that slugify alike get a short hash suffix"""
+    slugs = {}
+    taken = set()
+    for name in sorted(set(names)):
+        slug = slugify(name)
+        if slug in taken:
+            slug = f"{slug}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:6]}"
+        taken.add(slug)
+        slugs[name] = slug
+    return slugs
+
+
+def _groups(main_matches, other_matches):
+    """(kind, key, feed, relative path, matches) for every shard"""
+    groups = {}
+    for feed, matches in (("main", main_matches), ("other", other_matches)):
+        suffix = "" if feed == "main" else ".other"
+        for m in matches:
+            groups.setdefault(("date", m.date, feed, f"date/{m.date}{suffix}.json"), []).append(m)
+
+    slugs = unique_slugs(m.competition for m in main_matches + other_matches)
+    for feed, matches in (("main", main_matches), ("other", other_matches)):
+        for m in matches:
+            groups.setdefault(("competition", m.competition, feed, f"competition/{slugs[m.competition]}.json"),
+                              []).append(m)
+    return [key + (matches,) for key, matches in groups.items()]
+
+
+def load_index(out_dir=SHARDS_DIR):
+    path = os.path.join(out_dir, "index.json")
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"version": INDEX_VERSION, "shards": []}
+
+
+def write_shards(main_matches, other_matches, out_dir=SHARDS_DIR, base_url=BASE_URL):
+    """Write the shards and their index; returns the index"""
+    previous = {s["path"]: s for s in load_index(out_dir).get("shards", [])}
+    groups = _groups(canonical.canonicalize(main_matches), canonical.canonicalize(other_matches))
+    shards = []
+    written = 0
+    for kind, key, feed, rel, matches in groups:
+        path = os.path.join(out_dir, rel)
+        digest = canonical.content_hash(matches)
+        old = previous.get(rel)
+        if not (old and old["sha256"] == digest and os.path.exists(path)):
+            json_stream.dump(matches, path)
+            written += 1
+        shards.append({"kind": kind, "key": key, "feed": feed, "path": rel,
+                       "matches": len(matches), "bytes": os.path.getsize(path), "sha256": digest})
+    shards.sort(key=lambda s: (s["kind"], s["feed"], s["key"]))
+
+    # Drop the shards of days and competitions that are gone
+    keep = {s["path"] for s in shards}
+    removed = 0
+    for sub in ("date", "competition"):
+        sub_dir = os.path.join(out_dir, sub)
+        if os.path.isdir(sub_dir):
+            for name in os.listdir(sub_dir):
+                if f"{sub}/{name}" not in keep:
+                    os.remove(os.path.join(sub_dir, name))
+                    removed += 1
+
+    index = {"version": INDEX_VERSION, "base_url": base_url, "shards": shards}
+    index_path = os.path.join(out_dir, "index.json")
+    with open(index_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    os.replace(index_path + ".tmp", index_path)
+    print(f"Shards: {len(shards)} ({written} rewritten, {removed} removed) in {out_dir}/")
+    return index
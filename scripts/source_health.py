@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-host circuit breaker and last-good cache for scraper sources
+
+A host that keeps failing is "opened" and skipped without touching the
+network until its backoff expires; it is then "half-open" and gets one cheap
+probe with a short timeout. State survives between runs in
+$TVSPORT_CACHE_DIR/source_health.json (default .cache/).
+"""
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+import httpclient
+import json_stream
+from models import Match
+
+CACHE_DIR = os.environ.get("TVSPORT_CACHE_DIR") or ".cache"
+STATE_FILE = os.path.join(CACHE_DIR, "source_health.json")
+LAST_GOOD_DIR = os.path.join(CACHE_DIR, "last_good")
+
+FAILURE_THRESHOLD = 3      # consecutive failures before opening
+BASE_BACKOFF = 5 * 60      # first open lasts 5 min, doubling on each reopen
+MAX_BACKOFF = 6 * 3600
+PROBE_TIMEOUT = 3          # seconds allowed to a half-open probe
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of issuing a request to a host whose circuit is open"""
+
+
+class CircuitBreaker:
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.hosts = {}
+        self.probing = set()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.hosts = json.load(f)
+            except ValueError:
+                print(f"WARNING: ignoring corrupt {path}")
+
+    def _host(self, host):
+        return self.hosts.setdefault(host, {
+            'state': CLOSED, 'failures': 0, 'opens': 0, 'open_until': 0, 'last_error': '',
+        })
+
+    def allow(self, host, now=None):
+        """True if a request to host may go out (moves open -> half-open when due)"""
+        now = now or time.time()
+        with self.lock:
+            h = self._host(host)
+            if h['state'] == CLOSED:
+                return True
+            # Open (or half-open left over from a previous run): one probe at a time
+            if now < h['open_until'] or host in self.probing:
+                return False
+            h['state'] = HALF_OPEN
+            self.probing.add(host)
+            return True
+
+    def timeout_for(self, host, timeout):
+        """Shorten the timeout for half-open probes so reprobing stays cheap"""
+        h = self.hosts.get(host)
+        if h and h['state'] == HALF_OPEN:
+            return min(timeout, PROBE_TIMEOUT) if timeout else PROBE_TIMEOUT
+        return timeout
+
+    def record_success(self, host):
+        with self.lock:
+            h = self._host(host)
+            self.probing.discard(host)
+            changed = h['state'] != CLOSED or h['failures']
+            h.update(state=CLOSED, failures=0, opens=0, open_until=0)
+            if changed:
+                self._save()
+
+    def release(self, host):
+        """End a half-open probe, whatever the request raised"""
+        with self.lock:
+            self.probing.discard(host)
+
+    def record_failure(self, host, error, now=None):
+        now = now or time.time()
+        with self.lock:
+            h = self._host(host)
+            h['failures'] += 1
+            h['last_error'] = str(error)[:200]
+            # Requests already in flight when the circuit opened don't reopen it
+            if h['state'] != OPEN and (h['state'] == HALF_OPEN or h['failures'] >= FAILURE_THRESHOLD):
+                self.probing.discard(host)
+                h['opens'] += 1
+                backoff = min(BASE_BACKOFF * 2 ** (h['opens'] - 1), MAX_BACKOFF)
+                h.update(state=OPEN, open_until=now + backoff)
+                print(f"⚠️ {host}: circuit ouvert pour {backoff // 60} min ({h['last_error']})")
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.hosts, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def breaker():
+    """Process-wide breaker, loaded on first use"""
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker()
+        return _breaker
+
+
+def get(url, **kwargs):
+    """httpclient.get() guarded by the host's circuit breaker.
+
+    Raises CircuitOpenError without touching the network when the host is
+    known bad. Connection errors, timeouts, 5xx and 429 count as failures.
+    """
+    host = urlsplit(url).hostname or url
+    b = breaker()
+    if not b.allow(host):
+        raise CircuitOpenError(f"{host} ignoré jusqu'à "
+                               f"{time.strftime('%H:%M', time.localtime(b.hosts[host]['open_until']))}")
+    kwargs['timeout'] = b.timeout_for(host, kwargs.get('timeout'))
+    try:
+        response = httpclient.get(url, **kwargs)
+    except requests.RequestException as e:
+        b.record_failure(host, e)
+        raise
+    finally:
+        # Any other exception must not leave the host marked as probing forever
+        b.release(host)
+    if response.status_code >= 500 or response.status_code == 429:
+        b.record_failure(host, f"HTTP {response.status_code}")
+    else:
+        b.record_success(host)
+    return response
+
+
+def save_last_good(source, matches):
+    """Remember the latest successful result of a source
+
+    An empty result only leaves a marker: a failed fetch still falls back
+    to the last non-empty result, while load_last_run() returns [].
+    """
+    marker = os.path.join(LAST_GOOD_DIR, f"{source}.empty")
+    if not matches:
+        os.makedirs(LAST_GOOD_DIR, exist_ok=True)
+        open(marker, 'w').close()
+        return
+    json_stream.dump(matches, os.path.join(LAST_GOOD_DIR, f"{source}.json"), minify=True)
+    if os.path.exists(marker):
+        os.remove(marker)
+
+
+def load_last_good(source):
+    """Latest successful result of a source, or [] if none was recorded"""
+    path = os.path.join(LAST_GOOD_DIR, f"{source}.json")
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [Match.from_dict(d) for d in json.load(f)]
+
+
+def load_last_run(source):
+    """Result of the latest successful run of a source, [] if it found nothing"""
+    if os.path.exists(os.path.join(LAST_GOOD_DIR, f"{source}.empty")):
+        return []
+    return load_last_good(source)
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Built-in scraper sources
+
+Importing this module registers them with the sources registry:
+  sportsonline        sportsonline.ci prog.txt, every day section, rolling window
+  livetv_sx           livetv.sx upcoming events
+  footmercato         footmercato list, TheSportsDB logos, channels mapped to the M3U
+  footmercato_list    footmercato list with the logos shown on the page
+  footmercato_detail  footmercato list + broadcasters from every match page
+"""
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from urllib.parse import quote
+from zoneinfo import ZoneInfo
+
+import feedtime
+import html_parsing
+import mirror_logos
+import source_health
+import sources
+from models import Match
+
+FOOTMERCATO_URL = "https://www.footmercato.net/matchs/"
+
+
+# API pour récupérer les logos d'équipes (gratuit et sans clé API)
+@lru_cache(maxsize=None)
+def get_team_logo(team_name):
+    """Récupère le logo d'une équipe via l'API team-lookup"""
+    # Copie locale déjà connue (mirror_logos.py) : pas d'appel réseau
+    mirrored = mirror_logos.mirrored_logo(team_name)
+    if mirrored:
+        return mirrored
+    try:
+        # Essayer d'abord avec TheSportsDB (gratuit)
+        team_clean = team_name.strip()
+        # URL encode le nom
+        encoded_name = quote(team_clean)
+        url = f"https://www.thesportsdb.com/api/v1/json/3/searchteams.php?t={encoded_name}"
+        response = sources.fetch(url, timeout=5)
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('teams') and len(data['teams']) > 0:
+                team_data = data['teams'][0]
+                # Retourner le badge/logo de l'équipe
+                logo = team_data.get('strTeamBadge') or team_data.get('strTeamLogo')
+                if logo:
+                    return logo
+    except Exception:
+        pass
+    return ""
+
+
+def get_team_logos(team_names):
+    """{team: logo} pour plusieurs équipes, requêtes en parallèle"""
+    names = list(dict.fromkeys(t for t in team_names if t))
+    return dict(zip(names, sources.map_concurrent(get_team_logo, names)))
+
+
+# Mapping des chaînes de diffusion vers les noms dans le M3U
+CHANNEL_MAPPING = {
+    # Espagne
+    "LaLiga TV": ["M. LaLiga", "LaLiga", "M+ LaLiga"],
+    "beIN Sports": ["Bein Sports", "beIN SPORTS"],
+    "DAZN LaLiga": ["Dazn Laliga", "DAZN LaLiga"],
+    "M+ LaLiga": ["M. LaLiga"],
+    "Movistar LaLiga": ["M. LaLiga"],
+
+    # France
+    "Canal+": ["Canal+", "Canal Plus"],
+    "Prime Video": ["Amazon Prime"],
+    "beIN Sports 1": ["Bein Sports 1"],
+    "beIN Sports 2": ["Bein Sports 2"],
+
+    # Angleterre
+    "Sky Sports": ["Sky Sport"],
+    "BT Sport": ["BT Sport"],
+    "Sky Sports Premier League": ["Sky Sport Premier League"],
+
+    # Allemagne
+    "Sky Deutschland": ["Sky Sport Bundesliga", "DAZN 1 DE"],
+
+    # Italie
+    "DAZN": ["DAZN 1", "DAZN 2", "DAZN"],
+    "Sky Sport": ["Sky Sport Calcio"],
+
+    # Portugal
+    "Sport TV": ["Sport TV", "Eleven Sport"],
+    "Eleven Sports": ["Eleven Sport"],
+
+    # Général
+    "Eurosport": ["Eurosport 1", "Eurosport 2"],
+    "ESPN": ["ESPN", "ESPN 1", "ESPN 2"],
+
+    # Par défaut - chaînes génériques espagnoles qui ont beaucoup de contenu
+    "TV": ["M. LaLiga", "DAZN 1", "Movistar Deportes"],
+}
+
+
+def map_broadcaster_to_channel(broadcaster):
+    """Convertit un nom de broadcaster en noms de chaînes du M3U"""
+    broadcaster_clean = broadcaster.strip()
+
+    # Vérifier dans le mapping
+    if broadcaster_clean in CHANNEL_MAPPING:
+        return CHANNEL_MAPPING[broadcaster_clean]
+
+    # Essayer de trouver une correspondance partielle
+    for key, values in CHANNEL_MAPPING.items():
+        if key.lower() in broadcaster_clean.lower() or broadcaster_clean.lower() in key.lower():
+            return values
+
+    # Par défaut, retourner le nom original + quelques chaînes populaires
+    return [broadcaster_clean, "M. LaLiga", "DAZN 1"]
+
+
+def today():
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+# prog.txt times are UK time; the published date/time use the feed timezone
+SPORTSONLINE_TZ = os.environ.get("TVSPORT_SPORTSONLINE_TZ") or "Europe/London"
+SPORTSONLINE_DAYS = 3  # today and the next two days
+SPORTSONLINE_INDEX = os.path.join(source_health.CACHE_DIR, "sportsonline_index.json")
+SPORTSONLINE_CHANNELS = ["M. LaLiga", "DAZN 1", "DAZN LaLiga", "Movistar Deportes"]
+WEEKDAYS = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"]
+
+
+def sportsonline_sections(text):
+    """[(weekday, [(HH:MM, event, url), ...]), ...] in file order"""
+    sections = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if line.upper() in WEEKDAYS:
+            sections.append((WEEKDAYS.index(line.upper()), []))
+            continue
+        if sections and "|" in line:
+            match_data = re.match(r"^(\d{2}:\d{2})\s+(.*?)\s+\|\s+(https?://\S+)", line)
+            if match_data:
+                sections[-1][1].append(match_data.groups())
+    return sections
+
+
+def section_dates(weekdays, today):
+    """Concrete date of each day section.
+
+    The section named after today's weekday is today (else the first one is
+    the nearest such day); the others follow it in file order.
+    """
+    if not weekdays:
+        return []
+    if today.weekday() in weekdays:
+        anchor, anchor_date = weekdays.index(today.weekday()), today
+    else:
+        anchor, anchor_date = 0, today + timedelta(days=(weekdays[0] - today.weekday() + 3) % 7 - 3)
+    dates = [None] * len(weekdays)
+    dates[anchor] = anchor_date
+    for i in range(anchor + 1, len(weekdays)):
+        dates[i] = dates[i - 1] + timedelta(days=(weekdays[i] - dates[i - 1].weekday()) % 7)
+    for i in range(anchor - 1, -1, -1):
+        dates[i] = dates[i + 1] - timedelta(days=(dates[i + 1].weekday() - weekdays[i]) % 7)
+    return dates
+
+
+def sportsonline_buckets(text, today):
+    """{prog.txt day (ISO date): [(utc epoch, event, url), ...]}"""
+    tz = ZoneInfo(SPORTSONLINE_TZ)
+    sections = sportsonline_sections(text)
+    buckets = {}
+    for (_, rows), day in zip(sections, section_dates([wd for wd, _ in sections], today)):
+        bucket = buckets.setdefault(day.isoformat(), [])
+        for time_str, event, url in rows:
+            hour, minute = map(int, time_str.split(":"))
+            local = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz)
+            bucket.append((int(local.timestamp()), event, url))
+    return buckets
+
+
+def _sportsonline_matches(rows):
+    """Match records (as dicts) for one day bucket"""
+    teams = []
+    for _, event, _ in rows:
+        # Extraire équipes si format "Team1 vs Team2"
+        parts = event.split(" vs ")
+        teams.append((parts[0].strip(), parts[1].strip()) if len(parts) == 2 else (event, ""))
+    logos = get_team_logos(t for pair in teams for t in pair)
+    out_tz = feedtime.feed_tz()
+    matches = []
+    for (epoch, _, url), (home_team, away_team) in zip(rows, teams):
+        kickoff = datetime.fromtimestamp(epoch, timezone.utc)
+        local = kickoff.astimezone(out_tz)
+        # Pour SportsOnline, on ajoute les chaînes principales espagnoles
+        m = Match(local.strftime("%H:%M"), local.strftime("%Y-%m-%d"), home_team, away_team,
+                  logos.get(home_team, ""), logos.get(away_team, ""),
+                  link=url, channels=SPORTSONLINE_CHANNELS)
+        m["kickoff_utc"] = kickoff.strftime("%Y-%m-%dT%H:%M:%SZ")
+        matches.append(m.to_dict())
+    return matches
+
+
+def _load_sportsonline_index():
+    if os.path.exists(SPORTSONLINE_INDEX):
+        with open(SPORTSONLINE_INDEX, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get("tz") == SPORTSONLINE_TZ:
+            return index
+    return {"tz": SPORTSONLINE_TZ, "sha256": "", "days": {}}
+
+
+@sources.register("sportsonline", "https://sportsonline.ci/prog.txt", label="SportsOnline", cadence=600)
+def parse_sportsonline(response):
+    """Tous les jours de prog.txt, indexés par jour; publie une fenêtre glissante de SPORTSONLINE_DAYS jours
+
+    Un prog.txt inchangé n'est pas réanalysé, et seuls les jours dont les
+    lignes ont changé sont reconstruits (recherche de logos comprise).
+    """
+    today = datetime.now(ZoneInfo(SPORTSONLINE_TZ)).date()
+    window = [(today + timedelta(days=i)).isoformat() for i in range(SPORTSONLINE_DAYS)]
+    index = _load_sportsonline_index()
+    digest = hashlib.sha256(response.content).hexdigest()
+
+    if digest != index["sha256"]:
+        days = {}
+        rebuilt = 0
+        for day, rows in sportsonline_buckets(response.text, today).items():
+            if day < window[0]:
+                continue
+            rows_hash = hashlib.sha256(json.dumps(rows).encode("utf-8")).hexdigest()
+            old = index["days"].get(day)
+            if old and old["sha256"] == rows_hash:
+                days[day] = old
+            else:
+                days[day] = {"sha256": rows_hash, "matches": _sportsonline_matches(rows)}
+                rebuilt += 1
+        index = {"tz": SPORTSONLINE_TZ, "sha256": digest, "days": days}
+        os.makedirs(os.path.dirname(SPORTSONLINE_INDEX), exist_ok=True)
+        with open(SPORTSONLINE_INDEX + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(SPORTSONLINE_INDEX + ".tmp", SPORTSONLINE_INDEX)
+        print(f"SportsOnline: {len(days)} jours dans prog.txt, {rebuilt} reconstruits")
+
+    return [Match.from_dict(d) for day in window for d in index["days"].get(day, {}).get("matches", [])]
+
+
+@sources.register("livetv_sx", "https://livetv.sx/enx/allupcomingsports/1/", label="LiveTV.sx", cadence=600)
+def parse_livetv_sx(response):
+    """Matchs du jour depuis la page des événements à venir"""
+    soup = html_parsing.parse_nodes(response.content, html_parsing.EVENT_CLASSES)
+    rows = []
+    for event in soup.select('.event'):
+        time_el = event.select_one('.time')
+        teams_el = event.select_one('.teams')
+        if time_el and teams_el:
+            teams_text = teams_el.get_text(strip=True)
+            teams = teams_text.split(" - ")
+            home_team = teams[0].strip() if len(teams) > 0 else teams_text
+            away_team = teams[1].strip() if len(teams) > 1 else ""
+            rows.append((time_el.get_text(strip=True), home_team, away_team))
+
+    logos = get_team_logos(t for row in rows for t in row[1:])
+    date = today()
+    # Chaînes génériques populaires
+    channels = ["M. LaLiga", "DAZN 1", "Sky Sport", "Bein Sports 1"]
+    return [Match(time_str, date, home_team, away_team,
+                  logos.get(home_team, ""), logos.get(away_team, ""),
+                  link="https://livetv.sx", channels=channels)
+            for time_str, home_team, away_team in rows]
+
+
+def _img_url(img_el):
+    if not img_el:
+        return ""
+    url = img_el.get('data-src') or img_el.get('src') or ""
+    if url.startswith("//"):
+        url = "https:" + url
+    return url
+
+
+def footmercato_rows(content):
+    """Raw fields of every match row on a footmercato listing page"""
+    soup = html_parsing.parse_nodes(content, html_parsing.MATCH_CLASSES)
+    match_elements = soup.select('.match') or soup.select('.matchList__item')
+    print(f"Found {len(match_elements)} potential match elements.")
+
+    rows = []
+    for match_el in match_elements:
+        time_el = match_el.select_one('.match__time, .time')
+        home_team_el = match_el.select_one('.match__team--home .team__name, .home-team')
+        away_team_el = match_el.select_one('.match__team--away .team__name, .away-team')
+        if not time_el or not home_team_el or not away_team_el:
+            continue
+
+        broadcasters = []
+        for b in match_el.select('.broadcaster__logo, .broadcaster'):
+            alt = b.get('alt') or b.get_text(strip=True)
+            if alt:
+                broadcasters.append(alt)
+
+        link = ""
+        link_el = match_el.select_one('a.match__link')
+        href = link_el.get('href') if link_el else None
+        if href:
+            link = href if href.startswith("http") else "https://www.footmercato.net" + href
+
+        rows.append({
+            "time": time_el.get_text(strip=True),
+            "home_team": home_team_el.get_text(strip=True),
+            "away_team": away_team_el.get_text(strip=True),
+            "home_logo": _img_url(match_el.select_one('.match__team--home .team__logo img')),
+            "away_logo": _img_url(match_el.select_one('.match__team--away .team__logo img')),
+            "broadcasters": broadcasters,
+            "link": link,
+        })
+    return rows
+
+
+@sources.register("footmercato", FOOTMERCATO_URL, label="FootMercato", cadence=600)
+def parse_footmercato(response):
+    """Liste FootMercato, logos TheSportsDB, chaînes mappées vers le M3U"""
+    rows = footmercato_rows(response.content)
+    logos = get_team_logos(t for row in rows for t in (row["home_team"], row["away_team"]))
+    date = today()
+    matches = []
+    for row in rows:
+        # Mapper les chaînes vers les noms du M3U, dédupliquer
+        mapped_channels = []
+        for ch in row["broadcasters"]:
+            mapped_channels.extend(map_broadcaster_to_channel(ch))
+        mapped_channels = list(dict.fromkeys(mapped_channels))
+
+        matches.append(Match(row["time"], date, row["home_team"], row["away_team"],
+                             logos.get(row["home_team"], ""), logos.get(row["away_team"], ""),
+                             link=FOOTMERCATO_URL,
+                             channels=mapped_channels if mapped_channels else ["M. LaLiga", "DAZN 1"]))
+    return matches
+
+
+@sources.register("footmercato_list", FOOTMERCATO_URL, label="FootMercato (liste)")
+def parse_footmercato_list(response):
+    """Liste FootMercato avec les logos et diffuseurs affichés sur la page"""
+    date = today()
+    return [Match(row["time"], date, row["home_team"], row["away_team"],
+                  row["home_logo"], row["away_logo"],
+                  link=row["link"], channels=row["broadcasters"])
+            for row in footmercato_rows(response.content)]
+
+
+def _detail_broadcasters(response):
+    if response is None or response.status_code != 200:
+        return []
+    soup = html_parsing.parse_nodes(response.content, ("broadcaster__logo",))
+    return [img.get('alt') for img in soup.select('.broadcaster__logo') if img.get('alt')]
+
+
+@sources.register("footmercato_detail", FOOTMERCATO_URL, label="FootMercato (détails)")
+def parse_footmercato_detail(response):
+    """Liste FootMercato complétée par les diffuseurs de chaque page de match"""
+    rows = footmercato_rows(response.content)
+    links = [row["link"] for row in rows if row["link"]]
+    details = dict(zip(links, sources.fetch_many(links, timeout=5)))
+    date = today()
+
+    matches = []
+    for row in rows:
+        channels = row["broadcasters"] + _detail_broadcasters(details.get(row["link"]))
+        channels = list(dict.fromkeys(c for c in channels if c))
+
+        # Normalize channel names for App matching
+        final_channels = []
+        for c in channels:
+            final_channels.append(c)
+            c_lower = c.lower()
+            if "bein" in c_lower: final_channels.append("beIN Sports")
+            if "canal" in c_lower: final_channels.append("Canal+")
+            if "rmc" in c_lower: final_channels.append("RMC Sport")
+            if "dazn" in c_lower: final_channels.append("DAZN")
+
+        matches.append(Match(row["time"], date, row["home_team"], row["away_team"],
+                             row["home_logo"], row["away_logo"],
+                             link=row["link"], channels=list(dict.fromkeys(final_channels))))
+    return matches
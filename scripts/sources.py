@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scraper source registry
+
+A source only declares its URL, parser and cadence; the registry supplies
+the shared session, circuit breaker, last-good cache, concurrency, timeouts
+and metrics:
+
+    @sources.register("example", "https://example.com/matches", cadence=600)
+    def parse_example(response):
+        return [Match("20:00", date, home_team, away_team, ...)]
+
+    matches = sources.run("example")
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fetch_scheduler
+import source_health
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+DEFAULT_TIMEOUT = 10
+MAX_WORKERS = 8
+# A cron tick can land slightly before the cadence expires
+CADENCE_TOLERANCE = 60
+
+RUNS_FILE = os.path.join(source_health.CACHE_DIR, "source_runs.json")
+METRICS_FILE = os.path.join(source_health.CACHE_DIR, "source_metrics.json")
+
+
+class Source:
+    def __init__(self, name, url, parse, label=None, cadence=0, timeout=DEFAULT_TIMEOUT, headers=None):
+        self.name = name
+        self.url = url
+        self.parse = parse
+        self.label = label or name
+        self.cadence = cadence
+        self.timeout = timeout
+        self.headers = headers or {}
+
+
+REGISTRY = {}
+METRICS = {}
+_runs_lock = threading.Lock()
+
+
+def register(name, url, label=None, cadence=0, timeout=DEFAULT_TIMEOUT, headers=None):
+    """Decorator registering parse(response) -> list of models.Match as a source.
+
+    cadence is the minimum number of seconds between two fetches; in between,
+    the last good result is served.
+    """
+    def decorator(parse):
+        REGISTRY[name] = Source(name, url, parse, label, cadence, timeout, headers)
+        return parse
+    return decorator
+
+
+def fetch(url, timeout=DEFAULT_TIMEOUT, headers=None):
+    """GET through the shared session and circuit breaker, with default headers"""
+    merged = dict(DEFAULT_HEADERS)
+    merged.update(headers or {})
+    return source_health.get(url, headers=merged, timeout=timeout)
+
+
+def map_concurrent(fn, items, max_workers=MAX_WORKERS):
+    """[fn(item) for item in items], run on a thread pool"""
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+
+def fetch_many(urls, timeout=DEFAULT_TIMEOUT, headers=None):
+    """Fetch urls concurrently; failed or skipped requests yield None"""
+    def one(url):
+        try:
+            return fetch(url, timeout, headers)
+        except Exception:
+            return None
+    return map_concurrent(one, urls)
+
+
+def _load_runs():
+    if os.path.exists(RUNS_FILE):
+        with open(RUNS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def _mark_run(name, now):
+    with _runs_lock:
+        runs = _load_runs()
+        runs[name] = int(now)
+        os.makedirs(os.path.dirname(RUNS_FILE), exist_ok=True)
+        with open(RUNS_FILE + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(runs, f, indent=2)
+        os.replace(RUNS_FILE + ".tmp", RUNS_FILE)
+
+
+def _due(source, now):
+    if not source.cadence:
+        return True
+    last = _load_runs().get(source.name)
+    return last is None or now + CADENCE_TOLERANCE >= last + source.cadence
+
+
+def run(name, force=False):
+    """Fetch and parse one source; never raises, returns a list of matches
+
+    A source that fails returns its last good result (source_health), or []
+    if it never succeeded; one skipped for its cadence returns what its last
+    run found, even if that was nothing.
+    """
+    source = REGISTRY[name]
+    now = time.time()
+    metrics = {"status": "ok", "matches": 0, "fetch_ms": 0, "parse_ms": 0}
+    matches = []
+
+    if not force and not _due(source, now):
+        matches = source_health.load_last_run(name)
+        metrics["status"] = "cadence"
+        print(f"⏭️ {source.label}: cadence {source.cadence}s non écoulée, {len(matches)} matchs en cache")
+    else:
+        try:
+            start = time.perf_counter()
+            response = fetch(source.url, source.timeout, source.headers)
+            response.raise_for_status()
+            parsed_at = time.perf_counter()
+            matches = source.parse(response)
+            metrics["fetch_ms"] = round((parsed_at - start) * 1000)
+            metrics["parse_ms"] = round((time.perf_counter() - parsed_at) * 1000)
+            source_health.save_last_good(name, matches)
+            _mark_run(name, now)
+            print(f"✅ {source.label}: {len(matches)} matchs trouvés")
+        except source_health.CircuitOpenError as e:
+            matches = source_health.load_last_good(name)
+            metrics["status"] = "circuit_open"
+            print(f"⏭️ {source.label}: {e}, {len(matches)} matchs servis depuis le cache")
+        except Exception as e:
+            matches = source_health.load_last_good(name)
+            metrics["status"] = "error"
+            metrics["error"] = str(e)[:200]
+            print(f"❌ Erreur {source.label}: {e}, {len(matches)} matchs servis depuis le cache")
+
+    metrics["matches"] = len(matches)
+    METRICS[name] = metrics
+    return matches
+
+
+def run_all(names=None, max_workers=4):
+    """Run several sources concurrently; returns {name: matches}"""
+    names = list(names or REGISTRY)
+    results = map_concurrent(run, names, max_workers)
+    return dict(zip(names, results))
+
+
+def write_metrics(path=METRICS_FILE):
+    """Persist the metrics of the sources run in this process"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"generated_at": int(time.time()), "sources": METRICS,
+                   "hosts": fetch_scheduler.scheduler().metrics()}, f, indent=2)
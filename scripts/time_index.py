@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kickoff/end time index for "live now" and "starting soon" queries
+
+Every match written through canonical.write() carries kickoff_epoch and
+end_epoch (kickoff plus an estimated duration for its kind of
+competition), and a <name>.times.json sidecar holds them as sorted
+arrays:
+
+    {"version": 1, "max_duration": 21600,
+     "starts": [...], "ends": [...], "ids": [...]}
+
+ids are positions in the match file. starts is sorted, and no match lasts
+longer than max_duration, so both queries are two binary searches:
+
+    live:  starts in (now - max_duration, now], then keep ends > now
+    soon:  starts in [now, now + window)
+
+  python scripts/time_index.py live [--file matches.json]
+  python scripts/time_index.py soon --hours 2
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+from feedtime import kickoff_epoch
+from models import normalize
+
+INDEX_VERSION = 1
+DEFAULT_DURATION = 120  # football: 90 min, half-time, stoppage time
+# (words or phrases of the competition name, minutes), first hit wins. Whole
+# words only: "Riyadh Open" is not tennis (the feed files winter sports under
+# it), "Tour" alone could be golf or cycling.
+DURATIONS = [
+    (("golf", "pga"), 360),
+    (("rally", "wrc", "dakar"), 240),
+    (("nfl", "super bowl"), 210),
+    (("atp", "wta", "tenis", "tennis", "open australia", "australian open", "us open",
+      "roland garros", "wimbledon", "torneo de"), 180),
+    (("nba", "acb", "euroliga", "euroleague", "ncaa", "basket", "baloncesto"), 150),
+    (("sailgp", "ciclismo", "tour de", "vuelta", "giro"), 150),
+    (("f1", "formula", "motogp", "moto2", "moto3", "gp"), 120),
+    (("rugby", "naciones", "top 14"), 110),
+    (("asobal", "ehf", "balonmano", "handball"), 100),
+]
+_DURATION_PATTERNS = [(re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + r')\b'), minutes)
+                      for keywords, minutes in DURATIONS]
+
+
+@lru_cache(maxsize=1024)
+def estimated_minutes(competition):
+    name = normalize(competition or "")
+    for pattern, minutes in _DURATION_PATTERNS:
+        if pattern.search(name):
+            return minutes
+    return DEFAULT_DURATION
+
+
+def annotate(matches):
+    """Set kickoff_epoch/end_epoch on every match whose date and time parse"""
+    for m in matches:
+        start = kickoff_epoch(m)
+        if start is not None:
+            m["kickoff_epoch"] = start
+            m["end_epoch"] = start + estimated_minutes(m.competition) * 60
+
+
+def build(matches):
+    """Index of matches (annotated, in file order)"""
+    entries = sorted((m["kickoff_epoch"], m["end_epoch"], i)
+                     for i, m in enumerate(matches) if "kickoff_epoch" in m)
+    return {
+        "version": INDEX_VERSION,
+        "max_duration": max((end - start for start, end, _ in entries), default=0),
+        "starts": [start for start, _, _ in entries],
+        "ends": [end for _, end, _ in entries],
+        "ids": [i for _, _, i in entries],
+    }
+
+
+def index_path(path):
+    return os.path.splitext(path)[0] + ".times.json"
+
+
+def write(matches, path):
+    """Write the index of the match file at path"""
+    target = index_path(path)
+    with open(target + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(build(matches), f, separators=(',', ':'))
+    os.replace(target + ".tmp", target)
+
+
+def live(index, now):
+    """ids of the matches in progress at now"""
+    starts, ends, ids = index["starts"], index["ends"], index["ids"]
+    lo = bisect_right(starts, now - index["max_duration"])
+    hi = bisect_right(starts, now)
+    return [ids[i] for i in range(lo, hi) if ends[i] > now]
+
+
+def starting(index, now, window):
+    """ids of the matches kicking off in [now, now + window)"""
+    starts, ids = index["starts"], index["ids"]
+    return ids[bisect_left(starts, now):bisect_left(starts, now + window)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("query", choices=["live", "soon"])
+    parser.add_argument("--file", default="matches.json")
+    parser.add_argument("--hours", type=float, default=2, help="window of the soon query")
+    parser.add_argument("--now", type=int, help="epoch to query at (default: now)")
+    args = parser.parse_args()
+
+    with open(index_path(args.file), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    with open(args.file, 'r', encoding='utf-8') as f:
+        matches = json.load(f)
+    now = args.now or int(time.time())
+    if args.query == "live":
+        ids = live(index, now)
+    else:
+        ids = starting(index, now, int(args.hours * 3600))
+    for i in ids:
+        m = matches[i]
+        print(f"{m['date']} {m['time']}  {m['competition']}: {m['home_team']} - {m['away_team']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
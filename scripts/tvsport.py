@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single entry point for the tvsport scripts
+
+Each subcommand runs one script exactly as `python scripts/<script>.py`
+would, with the remaining arguments. Nothing is imported before a
+subcommand is chosen, so generating from a local eventos.m3u never loads
+requests or bs4 (bench_startup.py measures the difference):
+
+  python scripts/tvsport.py generate [--shards --xmltv epg.xml.gz ...]
+  python scripts/tvsport.py scrape [multi|icastresana|footmercato]
+  python scripts/tvsport.py inspect zip|jni PATH
+  python scripts/tvsport.py serve [-- generate options] | serve stats|refresh
+"""
+import os
+import runpy
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOLS_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "AceStreamTV")
+
+# command -> (module in scripts/, help)
+COMMANDS = {
+    "generate": ("generate_matches", "matches.json and matches_other.json from eventos.m3u"),
+    "serve": ("generator_daemon", "regenerate on every input change (generator daemon)"),
+    "ids": ("ace_ids", "new acestream ids of a playlist"),
+    "times": ("time_index", "live / starting soon matches"),
+    "schedule": ("refresh_schedule", "kickoff-aware refresh decision"),
+}
+SCRAPERS = {
+    "multi": "scrape_multi_sources",
+    "icastresana": "scrape_icastresana_eventos",
+    "footmercato": "scrape_matches",
+}
+# inspect target -> script in AceStreamTV/
+INSPECTORS = {
+    "zip": "zip_inspector.py",
+    "jni": "jni_scanner.py",
+}
+DAEMON_COMMANDS = ("run", "stats", "refresh", "--socket", "-h", "--help")
+
+
+def usage():
+    lines = ["usage: tvsport.py <command> [args...]", "", "commands:"]
+    for name, (_, text) in COMMANDS.items():
+        lines.append(f"  {name:<10} {text}")
+    lines.append(f"  {'scrape':<10} run a scraper: {', '.join(SCRAPERS)} (default: multi)")
+    lines.append(f"  {'inspect':<10} inspect an APK/XAPK ({', '.join(INSPECTORS)}) PATH")
+    return "\n".join(lines)
+
+
+def run_script(path, args):
+    """Run path as __main__ with args, as if it were started directly"""
+    sys.argv = [path] + args
+    sys.path.insert(0, os.path.dirname(path))
+    runpy.run_path(path, run_name="__main__")
+    return 0
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+    command, args = argv[0], argv[1:]
+
+    if command == "scrape":
+        target = args.pop(0) if args and args[0] in SCRAPERS else "multi"
+        module = SCRAPERS[target]
+    elif command == "inspect":
+        if len(args) < 2 or args[0] not in INSPECTORS:
+            print(f"usage: tvsport.py inspect {{{','.join(INSPECTORS)}}} PATH", file=sys.stderr)
+            return 2
+        return run_script(os.path.join(TOOLS_DIR, INSPECTORS[args[0]]), args[1:])
+    elif command in COMMANDS:
+        module = COMMANDS[command][0]
+        if command == "serve" and (not args or args[0] not in DAEMON_COMMANDS):
+            args = ["run"] + args
+    else:
+        print(f"unknown command: {command}\n\n{usage()}", file=sys.stderr)
+        return 2
+    return run_script(os.path.join(SCRIPTS_DIR, module + ".py"), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+XMLTV program guide from the parsed events
+
+Every acestream id of channel_mapping.json is a <channel>; every link of a
+match becomes a <programme> on its channel, from kickoff to the estimated
+end (time_index). The document is written element by element, so memory
+does not grow with the size of the guide. A path ending in .gz is
+gzip-compressed, without a timestamp in the header so unchanged guides
+stay byte-identical.
+
+    xmltv.write(main_matches + other_matches, channels, "epg.xml.gz")
+"""
+import gzip
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape, quoteattr
+
+import json_stream
+import time_index
+from feedtime import kickoff_epoch
+
+GENERATOR = "tvsport"
+WRITE_BUFFER = 64 * 1024
+
+
+def _time(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y%m%d%H%M%S +0000")
+
+
+def _span(m):
+    start = m.get("kickoff_epoch") or kickoff_epoch(m)
+    if start is None:
+        return None
+    end = m.get("end_epoch") or start + time_index.estimated_minutes(m.competition) * 60
+    return start, end
+
+
+def iter_xmltv(matches, channels):
+    """Yield the XMLTV document as UTF-8 chunks.
+
+    channels maps acestream id -> name (channel_mapping.json); ids only
+    seen in the events are added under their link's channel name.
+    """
+    yield (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+           f'<!DOCTYPE tv SYSTEM "xmltv.dtd">\n'
+           f'<tv generator-info-name="{GENERATOR}">\n').encode("utf-8")
+
+    # XMLTV wants every <channel> before the first <programme>
+    extra = {}
+    for m in matches:
+        for link in m.links:
+            if link.acestream_id not in channels:
+                extra.setdefault(link.acestream_id, link.channel_name)
+    for ace_id, name in list(channels.items()) + sorted(extra.items()):
+        yield (f'  <channel id={quoteattr(ace_id)}>\n'
+               f'    <display-name>{escape(name)}</display-name>\n'
+               f'  </channel>\n').encode("utf-8")
+
+    for m in matches:
+        span = _span(m)
+        if not span or not m.links:
+            continue
+        start, stop = _time(span[0]), _time(span[1])
+        title = f"{m.home_team} - {m.away_team}" if m.away_team else m.home_team
+        body = f'    <title lang="es">{escape(title)}</title>\n'
+        if m.competition:
+            body += (f'    <desc lang="es">{escape(m.competition)}</desc>\n'
+                     f'    <category lang="es">{escape(m.competition)}</category>\n')
+        if m.home_logo:
+            body += f'    <icon src={quoteattr(m.home_logo)} />\n'
+        for link in m.links:
+            yield (f'  <programme start="{start}" stop="{stop}" channel={quoteattr(link.acestream_id)}>\n'
+                   f'{body}  </programme>\n').encode("utf-8")
+
+    yield b'</tv>\n'
+
+
+def write(matches, channels, path):
+    """Write the guide to path (gzip-compressed if it ends in .gz); returns the programme count"""
+    programmes = 0
+    with json_stream.atomic_file(path) as raw:
+        out = gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) if path.endswith(".gz") else raw
+        pending, size = [], 0
+        for chunk in iter_xmltv(matches, channels):
+            programmes += chunk.startswith(b'  <programme')
+            pending.append(chunk)
+            size += len(chunk)
+            if size >= WRITE_BUFFER:
+                out.write(b''.join(pending))
+                pending, size = [], 0
+        out.write(b''.join(pending))
+        if out is not raw:
+            out.close()
+    return programmes
@@ -71,16 +71,28 @@ const savedLang = localStorage.getItem('preferredLang') || 'en';
 langSelect.value = savedLang;
 updateLanguage(savedLang);
 
-// Simple AOS effect logic
-window.addEventListener('scroll', () => {
-    const reveals = document.querySelectorAll('[data-aos]');
-    reveals.forEach(el => {
-        const windowHeight = window.innerHeight;
-        const revealTop = el.getBoundingClientRect().top;
-        const revealPoint = 150;
+// Simple AOS effect logic: reveal each element once, 150px inside the viewport
+const reveals = document.querySelectorAll('[data-aos]');
+if ('IntersectionObserver' in window) {
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.classList.add('aos-active');
+                observer.unobserve(entry.target);
+            }
+        });
+    }, { rootMargin: '0px 0px -150px 0px' });
+    reveals.forEach(el => observer.observe(el));
+} else {
+    reveals.forEach(el => el.classList.add('aos-active'));
+}
 
-        if (revealTop < windowHeight - revealPoint) {
-            el.classList.add('aos-active');
-        }
-    });
+// Drop the blurred placeholders (scripts/build_site_images.py) once the images are in
+document.querySelectorAll('img[data-src]').forEach(img => {
+    const clear = () => { img.style.background = ''; };
+    if (img.complete) {
+        clear();
+    } else {
+        img.addEventListener('load', clear, { once: true });
+    }
 });